@@ -0,0 +1,292 @@
+import argparse
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import urlparse
+
+import requests
+from loguru import logger
+from lxml import etree
+
+import article_utils
+import convertArticle
+import extraction_pool
+import http_cache
+import utilities
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+LOG_DIR = REPO_ROOT / "logs"
+LOG_DIR.mkdir(exist_ok=True)
+logger.add(LOG_DIR / "article_batch.log", rotation="256 KB", retention=5, enqueue=False)
+
+FETCH_MAX_WORKERS = 16
+# Concurrent requests to any one host, so a reading list full of one blog
+# does not hammer it.
+PER_HOST_CONNECTIONS = 2
+# GitHub throttles bursts of gist creation well below the hourly API limit.
+GIST_WRITE_INTERVAL_SECONDS = 2.0
+STAGES = ("fetch", "extract", "write")
+
+
+def _xml_root(content: bytes):
+    try:
+        return etree.fromstring(content, parser=etree.XMLParser(recover=True))
+    except etree.XMLSyntaxError:
+        return None
+
+
+def _feed_links(root) -> list[str]:
+    """Return item links from an RSS or Atom document."""
+    links = []
+    for item in root.iter("{*}item"):
+        link = item.findtext("{*}link")
+        if link and link.strip():
+            links.append(link.strip())
+    for entry in root.iter("{http://www.w3.org/2005/Atom}entry"):
+        for link in entry.iter("{http://www.w3.org/2005/Atom}link"):
+            if link.get("rel", "alternate") == "alternate" and link.get("href"):
+                links.append(link.get("href"))
+                break
+    return links
+
+
+def _read_source(source: str) -> bytes:
+    if article_utils.is_http_url(source):
+        response = requests.get(
+            source, headers={"User-Agent": article_utils.DEFAULT_USER_AGENT}, timeout=20
+        )
+        response.raise_for_status()
+        return response.content
+    return Path(source).read_bytes()
+
+
+def load_urls(source: str) -> list[str]:
+    """Read article URLs from a file or URL holding a URL list, OPML or RSS/Atom.
+
+    OPML outlines contribute their page link, and feed outlines (``xmlUrl``)
+    are expanded into their items. Duplicates are dropped, order is kept.
+    """
+    content = _read_source(source)
+    head = content[:1024].lstrip().lower()
+    urls = []
+    root = _xml_root(content) if head.startswith(b"<") else None
+    if root is None:
+        for line in content.decode("utf-8", "replace").splitlines():
+            line = line.strip()
+            if article_utils.is_http_url(line):
+                urls.append(line)
+    elif etree.QName(root).localname.lower() == "opml":
+        for outline in root.iter("outline"):
+            if outline.get("xmlUrl"):
+                try:
+                    urls.extend(load_urls(outline.get("xmlUrl")))
+                except (requests.RequestException, OSError) as exc:
+                    logger.error(
+                        "Failed to read feed {}: {}", outline.get("xmlUrl"), exc
+                    )
+            elif outline.get("htmlUrl") or outline.get("url"):
+                urls.append(outline.get("htmlUrl") or outline.get("url"))
+    else:
+        urls.extend(_feed_links(root))
+    return list(dict.fromkeys(article_utils.normalize_url(url) for url in urls))
+
+
+class _Stats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stages = {
+            stage: {"items": 0, "bytes": 0, "seconds": 0.0} for stage in STAGES
+        }
+
+    def record(self, stage: str, seconds: float, size: int = 0) -> None:
+        with self._lock:
+            entry = self.stages[stage]
+            entry["items"] += 1
+            entry["bytes"] += size
+            entry["seconds"] += seconds
+
+
+def _host_semaphore(semaphores: dict, lock: threading.Lock, host: str):
+    with lock:
+        if host not in semaphores:
+            semaphores[host] = threading.BoundedSemaphore(PER_HOST_CONNECTIONS)
+        return semaphores[host]
+
+
+def _gist_writer(jobs: queue.Queue, results: dict, stats: _Stats) -> None:
+    """Write queued gists one at a time, spaced to stay under GitHub's limits."""
+    last_write = 0.0
+    while True:
+        job = jobs.get()
+        if job is None:
+            return
+        wait = last_write + GIST_WRITE_INTERVAL_SECONDS - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        last_write = started = time.monotonic()
+        url = job["article"]["url"]
+        try:
+            gist_url = convertArticle.publish_article(
+                job["article"], job["markdown"], job["title"]
+            )
+        except Exception as exc:
+            logger.error("Failed to write gist for {}: {}", url, exc)
+            results[url] = False
+            continue
+        stats.record("write", time.monotonic() - started, len(job["markdown"]))
+        results[url] = gist_url
+
+
+def run(
+    source: str,
+    *,
+    force_refresh: bool = False,
+    fetch_workers: int = FETCH_MAX_WORKERS,
+) -> dict[str, str | bool]:
+    """Convert every article in ``source``; return ``{url: gist url or False}``.
+
+    With batch summarisation on, queued articles map to
+    ``utilities.SUMMARY_QUEUED``.
+
+    Articles go through ``convertArticle``'s stages. Fetching runs on threads
+    with at most ``PER_HOST_CONNECTIONS`` requests per host; readability and
+    html2text run in ``extraction_pool``, since they hold the GIL; gists are
+    written by one rate-limited writer thread. The stages overlap, and
+    per-stage throughput is logged at the end.
+    """
+    urls = load_urls(source)
+    logger.info("Converting {} articles from {}", len(urls), source)
+    stats = _Stats()
+    results: dict[str, str | bool] = {}
+    semaphores: dict[str, threading.BoundedSemaphore] = {}
+    semaphores_lock = threading.Lock()
+    write_jobs: queue.Queue = queue.Queue()
+    started = time.monotonic()
+
+    def host_slot(host: str) -> threading.BoundedSemaphore:
+        return _host_semaphore(semaphores, semaphores_lock, host)
+
+    # Canonical URL -> the first batch URL that reached it; later aliases share
+    # that URL's gist instead of being extracted and written again.
+    owners: dict[str, str] = {}
+    alias_of: dict[str, str] = {}
+    owners_lock = threading.Lock()
+
+    def claim(url: str, canonical_url: str) -> bool:
+        with owners_lock:
+            owner = owners.setdefault(canonical_url, url)
+        if owner != url:
+            alias_of[url] = owner
+        return owner == url
+
+    def convert_one(url: str) -> None:
+        article = convertArticle.lookup_article(url)
+        if article["gist_url"] and not force_refresh:
+            results[url] = article["gist_url"]
+            return
+        if not claim(url, article["canonical_url"]):
+            return
+        cached = None if force_refresh else convertArticle.cached_article(article)
+        if cached:
+            markdown, title = cached
+        else:
+            try:
+                with host_slot(urlparse(url).netloc.lower()):
+                    fetch_started = time.monotonic()
+                    html = convertArticle.fetch_article(article)
+                stats.record("fetch", time.monotonic() - fetch_started, len(html))
+                if article["gist_url"] and not force_refresh:
+                    results[url] = article["gist_url"]
+                    return
+                if not claim(url, article["canonical_url"]):
+                    return
+                extraction = extraction_pool.submit(html, url)
+                # Comments are network-bound; fetch them while the pool extracts.
+                comments_markdown = article_utils.extract_comments_markdown(
+                    html, url, host_slot=host_slot
+                )
+                markdown, title, cpu_seconds = extraction.result()
+                stats.record("extract", cpu_seconds, len(html))
+            except http_cache.NotModified:
+                results[url] = article["gist_url"]
+                return
+            if not markdown.strip():
+                logger.error("Empty markdown extracted from {}", url)
+                results[url] = False
+                return
+            if comments_markdown:
+                markdown = f"{markdown}\n\n{comments_markdown}"
+            convertArticle.store_article(article, markdown, title)
+        write_jobs.put({"article": article, "title": title, "markdown": markdown})
+
+    def convert(url: str) -> None:
+        # One bad article must not abort the batch and strand the writer.
+        try:
+            convert_one(url)
+        except Exception as exc:
+            logger.error("Failed to convert article {}: {}", url, exc)
+            results[url] = False
+
+    writer = threading.Thread(
+        target=_gist_writer, args=(write_jobs, results, stats), daemon=True
+    )
+    writer.start()
+    try:
+        with ThreadPoolExecutor(max_workers=fetch_workers) as fetchers:
+            list(fetchers.map(convert, urls))
+    finally:
+        write_jobs.put(None)
+        writer.join()
+
+    wall_seconds = time.monotonic() - started
+    for stage, entry in stats.stages.items():
+        logger.info(
+            "{}: {} items, {:.1f} MB, {:.1f}s busy, {:.2f} items/s over {:.1f}s wall",
+            stage,
+            entry["items"],
+            entry["bytes"] / 1e6,
+            entry["seconds"],
+            entry["items"] / wall_seconds if wall_seconds else 0.0,
+            wall_seconds,
+        )
+    for url, owner in alias_of.items():
+        results.setdefault(url, results.get(owner, False))
+    return {url: results.get(url, False) for url in urls}
+
+
+def print_results(results: dict[str, str | bool]) -> None:
+    for url, gist_url in results.items():
+        if gist_url == utilities.SUMMARY_QUEUED:
+            label = "QUEUED"
+        else:
+            label = gist_url or "FAILED"
+        print(f"{label}\t{url}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Convert a list, OPML export or RSS/Atom feed of articles to gists."
+    )
+    parser.add_argument("source", help="Path or URL of the URL list, OPML or feed.")
+    parser.add_argument(
+        "--force-refresh",
+        action="store_true",
+        help="Re-fetch articles that already have gists (equivalent to ###).",
+    )
+    parser.add_argument(
+        "--summarise",
+        action="store_true",
+        help="Summarize markdown before writing gists.",
+    )
+    args = parser.parse_args()
+    utilities.set_default_summarise(args.summarise)
+    results = run(args.source, force_refresh=args.force_refresh)
+    print_results(results)
+    return 0 if all(results.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,13 +1,23 @@
+import codecs
+import html as html_lib
 import json
 import os
 import re
-from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import Callable, ContextManager
+from urllib.parse import parse_qsl, urlencode, urljoin, urlparse, urlunparse
 
 import html2text
 import requests
-from bs4 import BeautifulSoup
 from loguru import logger
+from lxml.html import HtmlElement, fromstring, tostring
 from readability import Document
+from readability.htmls import build_doc, get_title, shorten_title
+
+import extraction_rules
+import http_cache
 
 DEFAULT_USER_AGENT = os.getenv("ARTICLE_USER_AGENT") or (
     "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
@@ -15,6 +25,22 @@ DEFAULT_USER_AGENT = os.getenv("ARTICLE_USER_AGENT") or (
 )
 MAX_COMMENTS = 20
 MAX_COMMENT_DEPTH = 4
+LESSWRONG_HOST = "www.lesswrong.com"
+LESSWRONG_COMMENT_PAGE_SIZE = 2 * MAX_COMMENTS
+# Bounds the fetch at the 200 comments that used to be requested in one go.
+LESSWRONG_COMMENT_MAX_PAGES = 5
+# Far beyond any article; stops a mislinked download or endless stream early.
+MAX_HTML_BYTES = 10 * 1024 * 1024
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
+# The HTML spec has browsers look for a <meta> charset in the first 1024 bytes;
+# some pages put theirs after a long <head> preamble.
+CHARSET_SNIFF_BYTES = 4096
+_CHARSET_RE = re.compile(r"""charset\s*=\s*["']?([\w.:-]+)""", re.I)
+_BOMS = (
+    (codecs.BOM_UTF8, "utf-8"),
+    (codecs.BOM_UTF16_LE, "utf-16-le"),
+    (codecs.BOM_UTF16_BE, "utf-16-be"),
+)
 
 
 def is_http_url(url: str) -> bool:
@@ -53,32 +79,101 @@ def strip_tracking_params(
     return urlunparse(parsed._replace(query=cleaned_query))
 
 
-def fetch_html(url: str, *, timeout: int = 20) -> str:
-    response = requests.get(
+def _charset_from(content_type: str) -> str | None:
+    match = _CHARSET_RE.search(content_type)
+    return match.group(1) if match else None
+
+
+def _decode_html(body: bytes, content_type: str) -> str:
+    """Decode ``body`` by its BOM, header charset or ``<meta>`` charset, else UTF-8.
+
+    Only the first ``CHARSET_SNIFF_BYTES`` are searched for a ``<meta>``
+    declaration; the body is never run through charset guessing.
+    """
+    for bom, encoding in _BOMS:
+        if body.startswith(bom):
+            return body[len(bom) :].decode(encoding, "replace")
+    for charset in (
+        _charset_from(content_type),
+        _charset_from(body[:CHARSET_SNIFF_BYTES].decode("ascii", "replace")),
+    ):
+        if not charset:
+            continue
+        try:
+            return body.decode(codecs.lookup(charset).name, "replace")
+        except LookupError:
+            logger.debug("Ignoring unknown charset {}", charset)
+    return body.decode("utf-8", "replace")
+
+
+def fetch_html(
+    url: str, *, timeout: int = 20, revalidate_for: str | None = None
+) -> tuple[str, dict]:
+    """Return the page's HTML and the HTTP validators to store once it is published.
+
+    With ``revalidate_for`` (an existing gist's guid), raises
+    ``http_cache.NotModified`` if the page is unchanged since that gist was built. Non-HTML responses and
+    pages over ``MAX_HTML_BYTES`` raise ``ValueError`` before being read in full.
+    """
+    response = http_cache.fetch(
         url,
+        revalidate_for=revalidate_for,
         headers={
             "User-Agent": DEFAULT_USER_AGENT,
             "Accept": "text/html,application/xhtml+xml",
         },
         timeout=timeout,
+        max_bytes=MAX_HTML_BYTES,
+        content_types=HTML_CONTENT_TYPES,
     )
-    response.raise_for_status()
-    html = response.text
+    html = _decode_html(response.content, response.headers.get("Content-Type", ""))
     if not html.strip():
         raise ValueError(f"Empty HTML response for {url}")
-    return html
+    return html, http_cache.validators_from(response)
+
+
+_CANONICAL_LINK_RE = re.compile(r"<link\b[^>]*\brel=[\"']?canonical\b[^>]*>", re.I)
+_HREF_RE = re.compile(r"\bhref=(?:\"([^\"]*)\"|'([^']*)'|([^\s>]+))", re.I)
+
+
+def find_canonical_url(html: str, url: str) -> str:
+    """Return the page's canonical URL, or ``url`` if it declares none usable.
+
+    Reads ``<link rel="canonical">`` from the head, falling back to Substack's
+    ``canonicalUrl`` preload, without parsing the document.
+    """
+    head_end = html.find("</head>")
+    link = _CANONICAL_LINK_RE.search(html, 0, head_end if head_end != -1 else len(html))
+    href_match = _HREF_RE.search(link.group(0)) if link else None
+    if href_match:
+        canonical = html_lib.unescape(next(filter(None, href_match.groups()), ""))
+    else:
+        try:
+            canonical = (_extract_substack_preloads(html) or {}).get("canonicalUrl")
+        except ValueError:
+            canonical = None
+    if not canonical:
+        return url
+    canonical = normalize_url(strip_tracking_params(urljoin(url, canonical)))
+    # Some sites point every page's canonical link at their home page.
+    if not is_http_url(canonical) or (
+        urlparse(canonical).path.strip("/") == ""
+        and urlparse(url).path.strip("/") != ""
+    ):
+        return url
+    return canonical
 
 
-def _extract_title(document: Document) -> str:
+def _extract_title(tree: HtmlElement) -> str:
     title = ""
     try:
-        title = document.short_title()
+        title = shorten_title(tree)
     except Exception as exc:
         logger.debug("Failed to read short_title: {}", exc)
 
     if not title:
         try:
-            title = document.title()
+            title = get_title(tree)
         except Exception as exc:
             logger.debug("Failed to read title: {}", exc)
 
@@ -147,44 +242,48 @@ def _convert_empty_image_links(markdown: str) -> str:
     return pattern.sub(replace, markdown)
 
 
-def _prepare_html_for_readability(html: str) -> str:
-    soup = BeautifulSoup(html, "html.parser")
-    updated = False
+def _element_text(element: HtmlElement) -> str:
+    return " ".join(text.strip() for text in element.itertext() if text.strip())
 
-    for anchor in soup.find_all("a", href=True):
+
+def _prepare_html_for_readability(tree: HtmlElement) -> None:
+    """Fold image-only links and captioned images into nearby paragraphs, in place."""
+    for anchor in tree.xpath("//a[@href][.//img or .//picture or .//source]"):
         href = anchor.get("href", "").strip()
         if not _looks_like_image_url(href):
             continue
-        if anchor.get_text(strip=True):
-            continue
-        if anchor.find(["img", "picture", "source"]) is None:
+        if _element_text(anchor):
             continue
-        anchor.unwrap()
-        updated = True
+        anchor.drop_tag()
 
-    for container in list(soup.find_all(["figure", "div"])):
-        imgs = container.find_all("img")
+    for container in tree.xpath("//*[self::figure or self::div][.//img]"):
+        imgs = container.xpath(".//img")
         if not imgs:
             continue
-        text = container.get_text(" ", strip=True)
+        text = _element_text(container)
         if text and len(text) > 200:
             continue
-        next_paragraph = container.find_next_sibling("p")
-        previous_paragraph = container.find_previous_sibling("p")
-        target = next_paragraph or previous_paragraph
-        if not target:
+        next_paragraph = next(container.itersiblings("p"), None)
+        previous_paragraph = next(container.itersiblings("p", preceding=True), None)
+        # Childless lxml elements are falsy, so compare against None explicitly.
+        target = next_paragraph if next_paragraph is not None else previous_paragraph
+        if target is None:
             continue
         for img in imgs:
+            # The container's text is carried over separately, below.
+            img.tail = None
             if target is next_paragraph:
+                img.tail, target.text = target.text, None
                 target.insert(0, img)
             else:
                 target.append(img)
         if text:
-            target.append(soup.new_string(f" {text}"))
-        container.decompose()
-        updated = True
-
-    return str(soup) if updated else html
+            last = target[-1] if len(target) else None
+            if last is None:
+                target.text = f"{target.text or ''} {text}"
+            else:
+                last.tail = f"{last.tail or ''} {text}"
+        container.drop_tree()
 
 
 def _normalize_comment_text(text: str | None) -> str:
@@ -213,18 +312,18 @@ def _parse_lesswrong_post_id(url: str) -> str | None:
     return parts[idx + 1]
 
 
-def _fetch_lesswrong_comments(post_id: str) -> list[dict]:
+def _fetch_lesswrong_comment_page(post_id: str, offset: int) -> list[dict]:
     query = """
     query PostComments($postId: String!, $limit: Int, $offset: Int) {
       comments(
         selector: {postCommentsTop: {postId: $postId}}
         limit: $limit
         offset: $offset
-        enableTotal: true
       ) {
         results {
           _id
           parentCommentId
+          directChildrenCount
           deleted
           pageUrl
           user { displayName username }
@@ -234,10 +333,14 @@ def _fetch_lesswrong_comments(post_id: str) -> list[dict]:
     }
     """
     response = requests.post(
-        "https://www.lesswrong.com/graphql",
+        f"https://{LESSWRONG_HOST}/graphql",
         json={
             "query": query,
-            "variables": {"postId": post_id, "limit": 200, "offset": 0},
+            "variables": {
+                "postId": post_id,
+                "limit": LESSWRONG_COMMENT_PAGE_SIZE,
+                "offset": offset,
+            },
         },
         headers={"User-Agent": DEFAULT_USER_AGENT},
         timeout=20,
@@ -249,6 +352,71 @@ def _fetch_lesswrong_comments(post_id: str) -> list[dict]:
     return payload.get("data", {}).get("comments", {}).get("results", []) or []
 
 
+def _fetch_lesswrong_comments(post_id: str) -> list[dict]:
+    """Fetch top-ranked comments a page at a time until the rendered thread is settled."""
+    comments: list[dict] = []
+    for page in range(LESSWRONG_COMMENT_MAX_PAGES):
+        results = _fetch_lesswrong_comment_page(
+            post_id, page * LESSWRONG_COMMENT_PAGE_SIZE
+        )
+        comments.extend(results)
+        if len(results) < LESSWRONG_COMMENT_PAGE_SIZE:
+            break
+        if _lesswrong_render_settled(comments):
+            break
+    return comments
+
+
+def _lesswrong_render_slots(
+    nodes: list[dict], depth: int, known_ids: set[str], open_ids: set[str]
+):
+    """Yield rendered nodes in ``_render_comment_tree`` order, ``None`` for open slots.
+
+    Comments are fetched in rank order, so a reply not fetched yet would sort
+    after every fetched sibling: a comment in ``open_ids`` (replies still
+    missing) and the root list end in an open slot. A root whose parent has
+    not been fetched may still move under it, so it is one too.
+    """
+    for node in nodes:
+        if depth == 1 and node.get("parent_id") and node["parent_id"] not in known_ids:
+            yield None
+        if not node.get("text"):
+            continue
+        yield node
+        if depth < MAX_COMMENT_DEPTH:
+            yield from _lesswrong_render_slots(
+                node["children"], depth + 1, known_ids, open_ids
+            )
+            if node["id"] in open_ids:
+                yield None
+    if depth == 1:
+        yield None
+
+
+def _lesswrong_render_settled(comments: list[dict]) -> bool:
+    """Whether fetching lower-ranked comments could no longer change the rendering."""
+    known_ids = {comment["_id"] for comment in comments if comment.get("_id")}
+    fetched_children = Counter(comment.get("parentCommentId") for comment in comments)
+    open_ids = {
+        comment_id
+        for comment in comments
+        if (comment_id := comment.get("_id"))
+        and (
+            comment.get("directChildrenCount") is None
+            or fetched_children[comment_id] < comment["directChildrenCount"]
+        )
+    }
+    tree = _build_lesswrong_comment_tree(comments)
+    count = 0
+    for slot in _lesswrong_render_slots(tree, 1, known_ids, open_ids):
+        if slot is None:
+            return False
+        count += 1
+        if count >= MAX_COMMENTS:
+            return True
+    return False
+
+
 def _build_lesswrong_comment_tree(comments: list[dict]) -> list[dict]:
     nodes: dict[str, dict] = {}
     order_index: dict[str, int] = {}
@@ -294,7 +462,59 @@ def _build_lesswrong_comment_tree(comments: list[dict]) -> list[dict]:
     return roots
 
 
+_SUBSTACK_PRELOAD_FIELDS = ("post", "base_url", "canonicalUrl")
+_JSON_DELIMITER_RE = re.compile(r"\s*([{:,}])\s*")
+
+
+def _js_string_end(text: str, start: int, closer: str) -> int:
+    """Return where the string literal opened before ``start`` ends with ``closer``.
+
+    ``closer`` starts with the closing quote; quotes preceded by an odd run of
+    backslashes are escaped and skipped.
+    """
+    end = text.find(closer, start)
+    while end != -1:
+        backslashes = 0
+        while text[end - 1 - backslashes] == "\\":
+            backslashes += 1
+        if backslashes % 2 == 0:
+            return end
+        end = text.find(closer, end + 1)
+    return -1
+
+
+def _expect_delimiter(text: str, pos: int, allowed: str) -> re.Match:
+    match = _JSON_DELIMITER_RE.match(text, pos)
+    if not match or match.group(1) not in allowed:
+        raise json.JSONDecodeError(f"Expecting one of {allowed!r}", text, pos)
+    return match
+
+
+def _decode_top_level_fields(text: str, fields: tuple[str, ...]) -> dict:
+    """Decode members of the JSON object in ``text`` until all ``fields`` are seen.
+
+    Members after the last wanted one are never decoded.
+    """
+    decoder = json.JSONDecoder()
+    found = {}
+    pos = _expect_delimiter(text, 0, "{").end()
+    if text.startswith("}", pos):
+        return found
+    while len(found) < len(fields):
+        key, pos = decoder.raw_decode(text, pos)
+        pos = _expect_delimiter(text, pos, ":").end()
+        value, pos = decoder.raw_decode(text, pos)
+        if key in fields:
+            found[key] = value
+        match = _expect_delimiter(text, pos, ",}")
+        if match.group(1) == "}":
+            break
+        pos = match.end()
+    return found
+
+
 def _extract_substack_preloads(html: str) -> dict | None:
+    """Return the ``post``, ``base_url`` and ``canonicalUrl`` preload fields."""
     marker = "window._preloads"
     idx = html.find(marker)
     if idx == -1:
@@ -303,26 +523,12 @@ def _extract_substack_preloads(html: str) -> dict | None:
     if start == -1:
         return None
     start += len('JSON.parse("')
-    chars: list[str] = []
-    escaped = False
-    for ch in html[start:]:
-        if escaped:
-            chars.append(ch)
-            escaped = False
-            continue
-        if ch == "\\":
-            escaped = True
-            chars.append(ch)
-            continue
-        if ch == '"':
-            break
-        chars.append(ch)
-    raw = "".join(chars)
-    if not raw:
+    end = _js_string_end(html, start, '")')
+    if end <= start:
         return None
     try:
-        decoded = json.loads(f'"{raw}"')
-        return json.loads(decoded)
+        decoded = json.loads(f'"{html[start:end]}"')
+        return _decode_top_level_fields(decoded, _SUBSTACK_PRELOAD_FIELDS)
     except json.JSONDecodeError as exc:
         raise ValueError(f"Failed to parse Substack preloads JSON: {exc}") from exc
 
@@ -349,16 +555,16 @@ def _fetch_substack_comments(base_url: str, post_id: int) -> list[dict]:
     return payload.get("comments", []) or []
 
 
-def _build_substack_comment_tree(comments: list[dict], base_url: str, slug: str) -> list[dict]:
+def _build_substack_comment_tree(
+    comments: list[dict], base_url: str, slug: str
+) -> list[dict]:
     roots: list[dict] = []
 
     def build_node(comment: dict) -> dict:
         author = _format_comment_author(comment.get("name"), comment.get("handle"))
         text = _normalize_comment_text(comment.get("body"))
         comment_id = comment.get("id")
-        url = (
-            f"{base_url}/p/{slug}/comment/{comment_id}" if comment_id else None
-        )
+        url = f"{base_url}/p/{slug}/comment/{comment_id}" if comment_id else None
         children = [
             build_node(child)
             for child in (comment.get("children") or [])
@@ -413,7 +619,17 @@ def _render_comment_tree(nodes: list[dict]) -> tuple[str, str | None]:
     return "\n".join(lines), last_url
 
 
-def _extract_comments_markdown(html: str, base_url: str | None) -> str:
+def extract_comments_markdown(
+    html: str,
+    base_url: str | None,
+    *,
+    host_slot: Callable[[str], ContextManager] | None = None,
+) -> str:
+    """Return a ``## Comments`` section for LessWrong and Substack pages, else "".
+
+    ``host_slot(host)``, if given, is held around the requests to the
+    comments API, e.g. to limit connections per host.
+    """
     if not base_url:
         return ""
     parsed = urlparse(base_url)
@@ -422,7 +638,8 @@ def _extract_comments_markdown(html: str, base_url: str | None) -> str:
         post_id = _parse_lesswrong_post_id(base_url)
         if not post_id:
             raise ValueError(f"Unable to parse LessWrong post id from {base_url}")
-        comments = _fetch_lesswrong_comments(post_id)
+        with host_slot(LESSWRONG_HOST) if host_slot else nullcontext():
+            comments = _fetch_lesswrong_comments(post_id)
         tree = _build_lesswrong_comment_tree(comments)
         rendered, last_url = _render_comment_tree(tree)
         if not rendered:
@@ -447,7 +664,8 @@ def _extract_comments_markdown(html: str, base_url: str | None) -> str:
     slug = post.get("slug") or _parse_substack_slug(canonical_url)
     if not base_url or not slug:
         return ""
-    comments = _fetch_substack_comments(base_url, post_id)
+    with host_slot(urlparse(base_url).netloc.lower()) if host_slot else nullcontext():
+        comments = _fetch_substack_comments(base_url, post_id)
     tree = _build_substack_comment_tree(comments, base_url, slug)
     rendered, last_url = _render_comment_tree(tree)
     if not rendered:
@@ -458,19 +676,62 @@ def _extract_comments_markdown(html: str, base_url: str | None) -> str:
     return section
 
 
-def extract_article_markdown(
-    html: str, base_url: str | None, *, include_comments: bool = False
-) -> tuple[str, str]:
-    prepared_html = _prepare_html_for_readability(html)
-    document = Document(prepared_html)
-    title = _extract_title(document)
-    content_html = document.summary()
+def _learn_extraction_rule(
+    tree: HtmlElement, content_html: str, base_url: str | None
+) -> None:
+    # Readability wraps its winning node (plus any siblings it kept) in a div.
+    wrapper = fromstring(content_html).find(".//body/div")
+    if wrapper is None or not len(wrapper):
+        return
+    candidate = max(wrapper, key=lambda child: len(child.text_content()))
+    extraction_rules.learn(tree, candidate, base_url)
+
+
+def extract_main_markdown(html: str, base_url: str | None) -> tuple[str, str]:
+    """Return the article's markdown and title; CPU-bound, no network access."""
+    # One lxml tree serves every stage; readability takes it without reparsing.
+    tree, _ = build_doc(html)
+    # Readability's cleaner drops these anyway; do it once before it copies the tree.
+    for element in tree.xpath("//script|//style"):
+        element.drop_tree()
+    _prepare_html_for_readability(tree)
+    title = _extract_title(tree)
+    node = extraction_rules.match(tree, base_url)
+    if node is not None:
+        # A known layout: take the content node directly, no readability scoring.
+        content_html = tostring(node, encoding="unicode")
+    else:
+        content_html = Document(tree).summary()
+        _learn_extraction_rule(tree, content_html, base_url)
     markdown = _html_to_markdown(content_html, base_url)
     markdown = _normalize_markdown(markdown)
     if title and not markdown.lstrip().startswith("#"):
         markdown = f"# {title}\n\n{markdown}"
-    if include_comments:
-        comments_markdown = _extract_comments_markdown(html, base_url)
-        if comments_markdown:
-            markdown = f"{markdown}\n\n{comments_markdown}"
+    return markdown, title
+
+
+def extract_article_markdown(
+    html: str,
+    base_url: str | None,
+    *,
+    include_comments: bool = False,
+    extract: Callable[[str, str | None], tuple[str, str]] = extract_main_markdown,
+) -> tuple[str, str]:
+    """Return the article's markdown, with its comments if asked, and its title.
+
+    ``extract`` does the CPU-bound part; ``extraction_pool.extract`` moves it
+    to another process when other extractions are running.
+    """
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        # The comment fetch is network-bound; let it overlap extraction.
+        comments_future = (
+            executor.submit(extract_comments_markdown, html, base_url)
+            if include_comments
+            else None
+        )
+        markdown, title = extract(html, base_url)
+        if comments_future:
+            comments_markdown = comments_future.result()
+            if comments_markdown:
+                markdown = f"{markdown}\n\n{comments_markdown}"
     return markdown, title
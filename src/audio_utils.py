@@ -0,0 +1,752 @@
+import csv
+import json
+import os
+import re
+import subprocess
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from difflib import SequenceMatcher
+from math import ceil
+from pathlib import Path
+from urllib.parse import urljoin, urlparse
+
+import numpy as np
+import requests
+from loguru import logger
+
+import download_utils
+
+# Whisper rejects uploads over 25 MB; stay comfortably below it.
+CHUNK_MAX_BYTES = 20 * 1024 * 1024
+CHUNK_TARGET_SECONDS = 600
+FALLBACK_BITRATE = 128_000
+# Whisper rejects very short files; trailing slivers this short carry no speech.
+MIN_CHUNK_SECONDS = 1.0
+SINGLE_SEGMENT_SECONDS = 10**7
+
+# Silence detection runs on low-rate mono PCM; speech pauses survive 8 kHz fine.
+ENERGY_SAMPLE_RATE = 8000
+ENERGY_FRAME_SECONDS = 0.05
+SILENCE_SEARCH_SECONDS = 30.0
+SILENCE_MIN_SECONDS = 0.4
+# Frames within this fraction of the quietest one count as the same silence.
+SILENCE_FLOOR_MARGIN = 0.1
+
+# Whisper resamples to 16 kHz mono internally, so anything richer is wasted upload.
+PREPROCESS_SAMPLE_RATE = 16000
+PREPROCESS_EXTENSION = "ogg"
+PREPROCESS_CODEC_ARGS = ["-c:a", "libopus", "-b:a", "24k", "-application", "voip"]
+# 10 ms frames at 16 kHz; aselect keeps or drops whole frames.
+PREPROCESS_FRAME_SAMPLES = 160
+
+# Frames quieter than this (int16 RMS, about -45 dBFS) count as silence, unless
+# the recording is so quiet that a tenth of its median level is lower still.
+VAD_SILENCE_RMS = 180.0
+VAD_RELATIVE_THRESHOLD = 0.1
+VAD_FLOOR_RMS = 20.0
+VAD_MIN_SILENCE_SECONDS = 1.5
+VAD_PAD_SECONDS = 0.3
+# Bounds the aselect expression length; only the longest gaps are cut beyond it.
+VAD_MAX_GAPS = 1000
+
+OVERLAP_WORDS_PER_SECOND = 4
+OVERLAP_MIN_MATCH_WORDS = 3
+
+# Codecs that can be stream-copied into a container Whisper accepts.
+COPYABLE_CODECS = {"mp3": "mp3", "aac": "m4a", "opus": "ogg", "vorbis": "ogg"}
+SEGMENT_FORMATS = {"mp3": "mp3", "m4a": "mp4", "ogg": "ogg"}
+
+
+def _run_ffmpeg(args: list[str], tool: str = "ffmpeg") -> str:
+    result = subprocess.run(
+        [tool, "-hide_banner", "-loglevel", "error", *args],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if result.returncode != 0:
+        logger.error("{} failed: {}", tool, " ".join(args))
+        if result.stderr.strip():
+            logger.error("{} stderr: {}", tool, result.stderr.strip())
+        raise RuntimeError(f"{tool} failed")
+    return result.stdout
+
+
+def probe_audio(audio_file: str | Path) -> dict:
+    output = _run_ffmpeg(
+        [
+            "-select_streams",
+            "a:0",
+            "-show_entries",
+            "stream=codec_name,bit_rate:format=duration,bit_rate,size",
+            "-of",
+            "json",
+            str(audio_file),
+        ],
+        tool="ffprobe",
+    )
+    info = json.loads(output)
+    streams = info.get("streams") or []
+    if not streams:
+        raise ValueError(f"No audio stream in {audio_file}")
+    stream = streams[0]
+    fmt = info.get("format") or {}
+    bit_rate = stream.get("bit_rate") or fmt.get("bit_rate")
+    return {
+        "codec": stream.get("codec_name"),
+        "duration": float(fmt.get("duration") or 0),
+        "bit_rate": int(bit_rate) if bit_rate else None,
+        "size": int(fmt.get("size") or 0),
+    }
+
+
+def _hls_attributes(line: str) -> dict:
+    return {
+        key: value.strip('"')
+        for key, value in re.findall(r'([A-Z0-9-]+)=("[^"]*"|[^,]*)', line)
+    }
+
+
+def hls_audio_rendition(playlist_url: str, headers: dict | None = None) -> str:
+    """Return the cheapest playlist in an HLS master that still carries audio.
+
+    An audio-only rendition (``EXT-X-MEDIA`` with ``TYPE=AUDIO``) wins;
+    otherwise the variant with the lowest ``BANDWIDTH`` is used. Media
+    playlists are returned unchanged.
+    """
+    response = requests.get(playlist_url, headers=headers, timeout=30)
+    response.raise_for_status()
+    lines = [line.strip() for line in response.text.splitlines() if line.strip()]
+    variants = []
+    for index, line in enumerate(lines):
+        if line.startswith("#EXT-X-MEDIA:"):
+            attributes = _hls_attributes(line)
+            if attributes.get("TYPE") == "AUDIO" and attributes.get("URI"):
+                return urljoin(response.url, attributes["URI"])
+        elif line.startswith("#EXT-X-STREAM-INF:") and index + 1 < len(lines):
+            bandwidth = _hls_attributes(line).get("BANDWIDTH", "")
+            variants.append(
+                (
+                    int(bandwidth) if bandwidth.isdigit() else float("inf"),
+                    urljoin(response.url, lines[index + 1]),
+                )
+            )
+    if not variants:
+        return playlist_url
+    return min(variants)[1]
+
+
+def extract_audio(source: str, output_prefix: str) -> str:
+    """Copy the first audio track of ``source`` (a file or URL) into its own file.
+
+    ffmpeg reads only what it needs from remote inputs, so no video file is
+    ever written. AAC is stream-copied into ``.m4a``, MP3/Opus/Vorbis into
+    their own containers, and anything else is re-encoded to MP3.
+    """
+    if urlparse(source).path.endswith(".m3u8"):
+        source = hls_audio_rendition(source)
+    info = probe_audio(source)
+    ext, codec_args = _codec_args(info["codec"])
+    # MPEG-TS carries AAC with ADTS headers that MP4 containers do not accept.
+    filter_args = ["-bsf:a", "aac_adtstoasc"] if info["codec"] == "aac" else []
+    output_file = f"{output_prefix}.{ext}"
+    _run_ffmpeg(
+        [
+            "-y",
+            "-i",
+            source,
+            "-map",
+            "0:a:0",
+            "-vn",
+            *codec_args,
+            *filter_args,
+            output_file,
+        ]
+    )
+    logger.info(
+        "Extracted {} audio from {} ({:.1f} MB)",
+        info["codec"],
+        source,
+        os.path.getsize(output_file) / 1e6,
+    )
+    return output_file
+
+
+def extract_remote_audio(sources: list[str], output_prefix: str) -> str:
+    """Extract audio from the first of ``sources`` that ffmpeg can stream.
+
+    ``sources`` are tried cheapest first. If every one fails to stream (some
+    hosts reject ffmpeg's ranged reads), the last non-HLS source is downloaded
+    in full and the audio extracted locally.
+    """
+    for source in sources:
+        try:
+            return extract_audio(source, output_prefix)
+        except (RuntimeError, requests.RequestException) as exc:
+            logger.warning("Streaming audio from {} failed: {}", source, exc)
+    downloadable = [
+        source for source in sources if not urlparse(source).path.endswith(".m3u8")
+    ]
+    if not downloadable:
+        raise RuntimeError(f"Could not extract audio from {sources[0]}")
+    media_file = f"{output_prefix}.download"
+    try:
+        download_utils.download_file(downloadable[-1], media_file)
+        return extract_audio(media_file, output_prefix)
+    finally:
+        Path(media_file).unlink(missing_ok=True)
+
+
+def _segment_seconds(info: dict, max_bytes: int, target_seconds: float) -> float:
+    bit_rate = info["bit_rate"]
+    if not bit_rate and info["duration"] and info["size"]:
+        bit_rate = info["size"] * 8 / info["duration"]
+    bit_rate = bit_rate or FALLBACK_BITRATE
+    # Leave headroom for VBR peaks and container overhead.
+    seconds_for_size = max_bytes * 8 / bit_rate * 0.9
+    return max(1.0, min(target_seconds, seconds_for_size))
+
+
+def _codec_args(codec: str | None) -> tuple[str, list[str]]:
+    """Return the chunk extension and ffmpeg codec arguments for ``codec``."""
+    if codec in COPYABLE_CODECS:
+        return COPYABLE_CODECS[codec], ["-c:a", "copy"]
+    return "mp3", ["-c:a", "libmp3lame", "-b:a", "64k"]
+
+
+def frame_energies(
+    audio_file: str,
+    *,
+    frame_seconds: float = ENERGY_FRAME_SECONDS,
+    sample_rate: int = ENERGY_SAMPLE_RATE,
+) -> np.ndarray:
+    """RMS energy of each ``frame_seconds`` frame of ``audio_file``.
+
+    ffmpeg decodes to low-rate mono PCM and frames are reduced block by block,
+    so memory stays proportional to the number of frames, not samples.
+    """
+    frame_length = int(sample_rate * frame_seconds)
+    block_bytes = frame_length * 2 * 4096
+    process = subprocess.Popen(
+        [
+            "ffmpeg",
+            "-hide_banner",
+            "-loglevel",
+            "error",
+            "-i",
+            audio_file,
+            "-map",
+            "0:a:0",
+            "-ac",
+            "1",
+            "-ar",
+            str(sample_rate),
+            "-f",
+            "s16le",
+            "-",
+        ],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    energies = []
+    while True:
+        data = process.stdout.read(block_bytes)
+        if not data:
+            break
+        samples = np.frombuffer(data[: len(data) - len(data) % 2], dtype=np.int16)
+        usable = len(samples) - len(samples) % frame_length
+        if usable:
+            frames = samples[:usable].astype(np.float32).reshape(-1, frame_length)
+            energies.append(np.sqrt(np.mean(frames * frames, axis=1)))
+    stderr = process.stderr.read().decode(errors="replace")
+    if process.wait() != 0:
+        logger.error("ffmpeg decode failed for {}: {}", audio_file, stderr.strip())
+        raise RuntimeError("ffmpeg failed")
+    return np.concatenate(energies) if energies else np.zeros(0, dtype=np.float32)
+
+
+def find_silence_boundaries(
+    energies: np.ndarray,
+    duration: float,
+    max_segment_seconds: float,
+    *,
+    frame_seconds: float = ENERGY_FRAME_SECONDS,
+    search_seconds: float = SILENCE_SEARCH_SECONDS,
+    quiet_seconds: float = SILENCE_MIN_SECONDS,
+) -> list[float]:
+    """Pick cut points no more than ``max_segment_seconds`` apart.
+
+    Each cut is placed in the middle of the quietest ``quiet_seconds`` stretch
+    within ``search_seconds`` before the latest allowed position.
+    """
+    window_frames = max(1, int(quiet_seconds / frame_seconds))
+    # Average over the quiet window so one quiet frame inside a word does not win.
+    smoothed = np.convolve(energies, np.ones(window_frames) / window_frames, "same")
+    boundaries: list[float] = []
+    position = 0.0
+    while duration - position > max_segment_seconds:
+        latest = position + max_segment_seconds
+        earliest = max(position + max_segment_seconds / 2, latest - search_seconds)
+        start_frame = int(earliest / frame_seconds)
+        end_frame = min(int(latest / frame_seconds), len(smoothed))
+        if end_frame <= start_frame:
+            boundary = latest
+        else:
+            window = smoothed[start_frame:end_frame]
+            quietest = int(np.argmin(window))
+            # argmin is where the silence starts; cut at the middle of its run.
+            quiet = window <= window[quietest] * (1 + SILENCE_FLOOR_MARGIN) + 1.0
+            first = last = quietest
+            while first > 0 and quiet[first - 1]:
+                first -= 1
+            while last < len(window) - 1 and quiet[last + 1]:
+                last += 1
+            boundary = (start_frame + (first + last) / 2) * frame_seconds
+        boundaries.append(boundary)
+        position = boundary
+    return boundaries
+
+
+def _regular_boundaries(duration: float, segment_seconds: float) -> list[float]:
+    return [
+        index * segment_seconds
+        for index in range(1, ceil(duration / segment_seconds))
+        if duration - index * segment_seconds >= MIN_CHUNK_SECONDS
+    ]
+
+
+def _segment_sequential(
+    audio_file: str,
+    output_prefix: str,
+    ext: str,
+    codec_args: list[str],
+    boundaries: list[float],
+) -> list[dict]:
+    list_path = f"{output_prefix}_segments.csv"
+    if boundaries:
+        split_args = ["-segment_times", ",".join(f"{b:.3f}" for b in boundaries)]
+    else:
+        split_args = ["-segment_time", str(SINGLE_SEGMENT_SECONDS)]
+    _run_ffmpeg(
+        [
+            "-y",
+            "-i",
+            audio_file,
+            "-map",
+            "0:a:0",
+            "-vn",
+            *codec_args,
+            "-f",
+            "segment",
+            *split_args,
+            "-segment_format",
+            SEGMENT_FORMATS[ext],
+            "-reset_timestamps",
+            "1",
+            "-segment_list",
+            list_path,
+            "-segment_list_type",
+            "csv",
+            f"{output_prefix}_chunk_%d.{ext}",
+        ]
+    )
+    chunks = []
+    output_dir = Path(output_prefix).parent
+    with open(list_path, newline="") as segment_list:
+        for filename, start, end in csv.reader(segment_list):
+            chunks.append(
+                {
+                    "path": str(output_dir / filename),
+                    "start": float(start),
+                    "duration": float(end) - float(start),
+                    "overlap": 0.0,
+                }
+            )
+    os.remove(list_path)
+    return chunks
+
+
+def _cut_chunk(
+    audio_file: str,
+    chunk_path: str,
+    start: float,
+    duration: float,
+    codec_args: list[str],
+) -> None:
+    _run_ffmpeg(
+        [
+            "-y",
+            "-ss",
+            f"{start:.3f}",
+            "-t",
+            f"{duration:.3f}",
+            "-i",
+            audio_file,
+            "-map",
+            "0:a:0",
+            "-vn",
+            *codec_args,
+            chunk_path,
+        ]
+    )
+
+
+def cut_chunks(
+    audio_file: str,
+    output_prefix: str,
+    spans: list[tuple[float, float, float]],
+    *,
+    ext: str,
+    codec_args: list[str],
+    max_workers: int | None = None,
+) -> list[dict]:
+    """Cut ``(start, duration, overlap)`` spans out of ``audio_file`` concurrently."""
+    chunks = [
+        {
+            "path": f"{output_prefix}_chunk_{index}.{ext}",
+            "start": start,
+            "duration": duration,
+            "overlap": overlap,
+        }
+        for index, (start, duration, overlap) in enumerate(spans)
+    ]
+    with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+        futures = [
+            executor.submit(
+                _cut_chunk,
+                audio_file,
+                chunk["path"],
+                chunk["start"],
+                chunk["duration"],
+                codec_args,
+            )
+            for chunk in chunks
+        ]
+        for future in futures:
+            future.result()
+    return chunks
+
+
+def _drop_slivers(chunks: list[dict]) -> list[dict]:
+    kept = []
+    for chunk in chunks:
+        if chunk["duration"] < MIN_CHUNK_SECONDS and kept:
+            os.remove(chunk["path"])
+            continue
+        kept.append(chunk)
+    return kept
+
+
+def segment_audio(
+    audio_file: str,
+    output_prefix: str,
+    *,
+    max_bytes: int = CHUNK_MAX_BYTES,
+    target_seconds: float = CHUNK_TARGET_SECONDS,
+    parallel: bool = False,
+    align_to_silence: bool = True,
+    overlap_seconds: float = 0.0,
+) -> list[dict]:
+    """Split ``audio_file`` into Whisper-sized chunks without decoding it in Python.
+
+    Codecs Whisper accepts are stream-copied; anything else is re-encoded to
+    MP3 once. With ``align_to_silence`` cuts move back to the quietest point
+    near each boundary. Each chunk is ``{"path", "start", "duration",
+    "overlap"}`` in seconds, where ``overlap`` is how much of its start repeats
+    the end of the previous chunk. ``parallel`` (implied by an overlap) cuts
+    chunks with one ffmpeg process each instead of a single segment-muxer pass.
+    """
+    info = probe_audio(audio_file)
+    duration = info["duration"]
+    ext, codec_args = _codec_args(info["codec"])
+    # The overlap is added to each chunk, so leave room for it under the size cap.
+    segment_seconds = (
+        _segment_seconds(info, max_bytes, target_seconds) - overlap_seconds
+    )
+    if align_to_silence and duration > segment_seconds:
+        boundaries = find_silence_boundaries(
+            frame_energies(audio_file), duration, segment_seconds
+        )
+    else:
+        boundaries = _regular_boundaries(duration, segment_seconds)
+    logger.info(
+        "Chunking {} ({:.0f}s, codec {}) into {} {} chunk(s) of at most {:.0f}s",
+        audio_file,
+        duration,
+        info["codec"],
+        len(boundaries) + 1,
+        ext,
+        segment_seconds,
+    )
+
+    if (parallel or overlap_seconds) and duration:
+        edges = [0.0, *boundaries, duration]
+        spans = []
+        for start, end in zip(edges, edges[1:]):
+            overlap = min(overlap_seconds, start)
+            spans.append((start - overlap, end - start + overlap, overlap))
+        chunks = cut_chunks(
+            audio_file, output_prefix, spans, ext=ext, codec_args=codec_args
+        )
+    else:
+        chunks = _segment_sequential(
+            audio_file, output_prefix, ext, codec_args, boundaries
+        )
+    return _drop_slivers(chunks)
+
+
+def speech_intervals(
+    energies: np.ndarray,
+    duration: float,
+    *,
+    frame_seconds: float = ENERGY_FRAME_SECONDS,
+    min_silence_seconds: float = VAD_MIN_SILENCE_SECONDS,
+    pad_seconds: float = VAD_PAD_SECONDS,
+    max_gaps: int = VAD_MAX_GAPS,
+) -> list[tuple[float, float]]:
+    """Return the ``(start, end)`` spans to keep once long silences are cut.
+
+    Silences of at least ``min_silence_seconds`` are shortened to
+    ``pad_seconds`` either side of the neighbouring speech.
+    """
+    if not len(energies):
+        return [(0.0, duration)]
+    threshold = max(
+        VAD_FLOOR_RMS,
+        min(VAD_SILENCE_RMS, VAD_RELATIVE_THRESHOLD * float(np.median(energies))),
+    )
+    quiet = np.concatenate(([False], energies < threshold, [False]))
+    edges = np.flatnonzero(quiet[1:] != quiet[:-1])
+    starts, ends = edges[::2], edges[1::2]
+    long_enough = ends - starts >= int(min_silence_seconds / frame_seconds)
+    starts, ends = starts[long_enough], ends[long_enough]
+    if len(starts) > max_gaps:
+        longest = np.sort(np.argsort(ends - starts)[-max_gaps:])
+        starts, ends = starts[longest], ends[longest]
+
+    intervals = []
+    position = 0.0
+    for start_frame, end_frame in zip(starts.tolist(), ends.tolist()):
+        gap_start = start_frame * frame_seconds + pad_seconds if start_frame else 0.0
+        gap_end = (
+            min(end_frame * frame_seconds, duration) - pad_seconds
+            if end_frame < len(energies)
+            else duration
+        )
+        # Round to the 10 ms frames the ffmpeg filter selects on.
+        gap_start, gap_end = round(gap_start, 2), round(gap_end, 2)
+        if gap_end <= gap_start:
+            continue
+        if gap_start > position:
+            intervals.append((position, gap_start))
+        position = gap_end
+    if duration > position:
+        intervals.append((position, duration))
+    return intervals or [(0.0, duration)]
+
+
+def _time_map(intervals: list[tuple[float, float]]) -> list[tuple[float, float, float]]:
+    time_map = []
+    output_start = 0.0
+    for start, end in intervals:
+        time_map.append((output_start, start, end - start))
+        output_start += end - start
+    return time_map
+
+
+def map_to_source_time(
+    time_map: list[tuple[float, float, float]], seconds: float
+) -> float:
+    """Translate a position in preprocessed audio back to the original recording.
+
+    ``time_map`` holds ``(output_start, source_start, length)`` entries as
+    returned by ``preprocess_audio``.
+    """
+    if not time_map:
+        return seconds
+    index = max(bisect_right(time_map, seconds, key=lambda entry: entry[0]) - 1, 0)
+    output_start, source_start, length = time_map[index]
+    return source_start + min(max(seconds - output_start, 0.0), length)
+
+
+def preprocess_audio(
+    audio_file: str, output_file: str, *, trim_silence: bool = True
+) -> dict:
+    """Re-encode ``audio_file`` as 16 kHz mono Opus, cutting long silences.
+
+    Returns ``{"path", "duration", "time_map"}``; pass ``time_map`` to
+    ``map_to_source_time`` to turn offsets in the new file into offsets in the
+    original.
+    """
+    info = probe_audio(audio_file)
+    duration = info["duration"]
+    intervals = [(0.0, duration)]
+    if trim_silence and duration:
+        intervals = speech_intervals(frame_energies(audio_file), duration)
+
+    filters = [
+        f"aformat=sample_rates={PREPROCESS_SAMPLE_RATE}:channel_layouts=mono",
+    ]
+    if intervals != [(0.0, duration)]:
+        # Offsets sit on 10 ms frame starts; nudge them so each frame is kept or
+        # dropped whole and no frame is counted twice.
+        selection = "+".join(
+            f"between(t,{start - 0.001:.3f},{end - 0.001:.3f})"
+            for start, end in intervals
+        )
+        filters += [
+            f"asetnsamples=n={PREPROCESS_FRAME_SAMPLES}:p=0",
+            f"aselect='{selection}'",
+            "asetpts=N/SR/TB",
+        ]
+    _run_ffmpeg(
+        [
+            "-y",
+            "-i",
+            audio_file,
+            "-map",
+            "0:a:0",
+            "-vn",
+            "-af",
+            ",".join(filters),
+            *PREPROCESS_CODEC_ARGS,
+            output_file,
+        ]
+    )
+    kept_seconds = sum(end - start for start, end in intervals)
+    logger.info(
+        "Preprocessed {}: kept {:.0f}s of {:.0f}s, {:.1f} MB -> {:.1f} MB",
+        audio_file,
+        kept_seconds,
+        duration,
+        info["size"] / 1e6,
+        os.path.getsize(output_file) / 1e6,
+    )
+    return {
+        "path": output_file,
+        "duration": kept_seconds,
+        "time_map": _time_map(intervals),
+    }
+
+
+def stream_segments(
+    source: str,
+    output_prefix: str,
+    *,
+    segment_seconds: float = CHUNK_TARGET_SECONDS,
+    keep_copy: bool = False,
+):
+    """Yield preprocessed chunk dicts as ffmpeg finishes each one of ``source``.
+
+    ``source`` is read once, as it downloads, so the first chunk can be
+    transcribed while the rest of a long stream is still arriving. Chunks are
+    16 kHz mono Opus like ``preprocess_audio``'s output, but cut at fixed
+    times: silence can only be found once the whole recording is in. With
+    ``keep_copy`` the original audio is also stream-copied to a file whose
+    path is the generator's return value.
+    """
+    if urlparse(source).path.endswith(".m3u8"):
+        source = hls_audio_rendition(source)
+    copy_args = []
+    copy_file = None
+    if keep_copy:
+        ext, codec_args = _codec_args(probe_audio(source)["codec"])
+        copy_file = f"{output_prefix}_full.{ext}"
+        copy_args = ["-map", "0:a:0", "-vn", *codec_args, copy_file]
+    chunk_dir = Path(output_prefix).parent
+    chunk_name = Path(output_prefix).name
+    process = subprocess.Popen(
+        [
+            "ffmpeg",
+            "-hide_banner",
+            "-loglevel",
+            "error",
+            "-y",
+            "-i",
+            source,
+            "-map",
+            "0:a:0",
+            "-vn",
+            "-af",
+            f"aformat=sample_rates={PREPROCESS_SAMPLE_RATE}:channel_layouts=mono",
+            *PREPROCESS_CODEC_ARGS,
+            "-f",
+            "segment",
+            "-segment_time",
+            str(segment_seconds),
+            "-segment_format",
+            SEGMENT_FORMATS[PREPROCESS_EXTENSION],
+            "-reset_timestamps",
+            "1",
+            # Each entry is written as its segment closes, so stdout paces the chunks.
+            "-segment_list",
+            "pipe:1",
+            "-segment_list_type",
+            "csv",
+            f"{output_prefix}_chunk_%03d.{PREPROCESS_EXTENSION}",
+            *copy_args,
+        ],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    handed_out = set()
+    try:
+        for row in csv.reader(process.stdout):
+            filename, start, end = row[0], float(row[1]), float(row[2])
+            path = str(chunk_dir / filename)
+            if end - start < MIN_CHUNK_SECONDS:
+                os.remove(path)
+                continue
+            handed_out.add(path)
+            yield {
+                "path": path,
+                "start": start,
+                "duration": end - start,
+                "overlap": 0.0,
+                "source_start": start,
+                "time_map": [],
+            }
+        stderr = process.stderr.read()
+        if process.wait() != 0:
+            logger.error("ffmpeg stderr: {}", stderr.strip())
+            raise RuntimeError(f"ffmpeg failed streaming {source}")
+        logger.info("Streamed {} into {} chunks", source, len(handed_out))
+        return copy_file
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        process.stdout.close()
+        process.stderr.close()
+        if process.returncode != 0:
+            # Chunks already handed out belong to the caller; tidy up the rest.
+            for path in chunk_dir.glob(f"{chunk_name}_chunk_*"):
+                if str(path) not in handed_out:
+                    path.unlink(missing_ok=True)
+            if copy_file:
+                Path(copy_file).unlink(missing_ok=True)
+
+
+def _normalise_word(word: str) -> str:
+    return "".join(char for char in word.lower() if char.isalnum())
+
+
+def dedupe_overlap(previous_text: str, text: str, overlap_seconds: float) -> str:
+    """Drop the words at the start of ``text`` that repeat the end of ``previous_text``.
+
+    Whisper rarely transcribes the shared audio identically, so the longest
+    common run of words between the two edges is used as the seam.
+    """
+    max_words = (
+        int(overlap_seconds * OVERLAP_WORDS_PER_SECOND) + OVERLAP_MIN_MATCH_WORDS
+    )
+    previous_words = [_normalise_word(w) for w in previous_text.split()[-max_words:]]
+    words = text.split()
+    head_words = [_normalise_word(w) for w in words[:max_words]]
+    match = SequenceMatcher(
+        None, previous_words, head_words, autojunk=False
+    ).find_longest_match(0, len(previous_words), 0, len(head_words))
+    if match.size < OVERLAP_MIN_MATCH_WORDS:
+        return text
+    return " ".join(words[match.b + match.size :])
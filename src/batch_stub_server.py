@@ -0,0 +1,180 @@
+"""Local stand-in for the OpenAI Files and Batch endpoints used by summary_batch.
+
+Run it and point the OpenAI client at it with
+``OPENAI_BASE_URL=http://127.0.0.1:8765/v1 OPENAI_API_KEY=stub``.
+Batches complete on their second retrieval and each request is answered
+with a deterministic digest of its input.
+"""
+
+import argparse
+import email
+import email.policy
+import hashlib
+import itertools
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_ids = itertools.count(1)
+_files: dict[str, bytes] = {}
+_batches: dict[str, dict] = {}
+_lock = threading.Lock()
+
+
+def _stub_output_text(body: dict) -> str:
+    content = "".join(
+        message.get("content", "") for message in body.get("input") or []
+    )
+    digest = hashlib.sha256(content.encode("utf-8")).hexdigest()[:12]
+    return f"- Stub summary {digest} ({len(content.split())} words)"
+
+
+def _run_batch(input_file_id: str) -> str:
+    lines = []
+    for line in _files[input_file_id].decode("utf-8").splitlines():
+        if not line.strip():
+            continue
+        request = json.loads(line)
+        lines.append(
+            json.dumps(
+                {
+                    "id": f"batch_req_{next(_ids)}",
+                    "custom_id": request["custom_id"],
+                    "response": {
+                        "status_code": 200,
+                        "body": {
+                            "object": "response",
+                            "output": [
+                                {
+                                    "type": "message",
+                                    "content": [
+                                        {
+                                            "type": "output_text",
+                                            "text": _stub_output_text(request["body"]),
+                                        }
+                                    ],
+                                }
+                            ],
+                        },
+                    },
+                    "error": None,
+                }
+            )
+        )
+    output_file_id = f"file-{next(_ids)}"
+    _files[output_file_id] = ("\n".join(lines) + "\n").encode("utf-8")
+    return output_file_id
+
+
+def _file_object(file_id: str, filename: str, purpose: str) -> dict:
+    return {
+        "id": file_id,
+        "object": "file",
+        "bytes": len(_files[file_id]),
+        "created_at": int(time.time()),
+        "filename": filename,
+        "purpose": purpose,
+        "status": "processed",
+    }
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def _send_json(self, payload: dict, status: int = 200) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self) -> bytes:
+        return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+    def do_POST(self):
+        body = self._read_body()
+        if self.path == "/v1/files":
+            message = email.message_from_bytes(
+                f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode()
+                + body,
+                policy=email.policy.HTTP,
+            )
+            fields = {}
+            for part in message.iter_parts():
+                fields[part.get_param("name", header="content-disposition")] = part
+            upload = fields["file"]
+            with _lock:
+                file_id = f"file-{next(_ids)}"
+                _files[file_id] = upload.get_payload(decode=True)
+            purpose = fields["purpose"].get_payload(decode=True).decode()
+            self._send_json(_file_object(file_id, upload.get_filename(), purpose))
+            return
+        if self.path == "/v1/batches":
+            request = json.loads(body)
+            with _lock:
+                batch_id = f"batch_{next(_ids)}"
+                _batches[batch_id] = {
+                    "id": batch_id,
+                    "object": "batch",
+                    "endpoint": request["endpoint"],
+                    "input_file_id": request["input_file_id"],
+                    "completion_window": request["completion_window"],
+                    "status": "validating",
+                    "output_file_id": None,
+                    "error_file_id": None,
+                    "created_at": int(time.time()),
+                }
+            self._send_json(_batches[batch_id])
+            return
+        self._send_json({"error": {"message": f"Unknown path {self.path}"}}, 404)
+
+    def do_GET(self):
+        parts = [part for part in self.path.split("/") if part]
+        if parts[:2] == ["v1", "batches"] and len(parts) == 3:
+            with _lock:
+                batch = _batches.get(parts[2])
+                if batch and batch["status"] == "validating":
+                    batch["status"] = "in_progress"
+                elif batch and batch["status"] == "in_progress":
+                    batch["output_file_id"] = _run_batch(batch["input_file_id"])
+                    batch["status"] = "completed"
+            if batch is None:
+                self._send_json({"error": {"message": "No such batch"}}, 404)
+                return
+            self._send_json(batch)
+            return
+        if parts[:2] == ["v1", "files"] and len(parts) == 4 and parts[3] == "content":
+            content = _files.get(parts[2])
+            if content is None:
+                self._send_json({"error": {"message": "No such file"}}, 404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "application/jsonl")
+            self.send_header("Content-Length", str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+            return
+        self._send_json({"error": {"message": f"Unknown path {self.path}"}}, 404)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(host: str = "127.0.0.1", port: int = 8765) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    server = ThreadingHTTPServer((args.host, args.port), StubHandler)
+    print(f"Serving stub OpenAI batch API on http://{args.host}:{args.port}/v1")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,9 @@ from pathlib import Path
 from loguru import logger
 
 import article_utils
+import extraction_pool
+import http_cache
+import page_cache
 import utilities
 
 REPO_ROOT = Path(__file__).resolve().parents[1]
@@ -18,6 +21,76 @@ logger.add(
 )
 
 
+def lookup_article(url: str) -> dict:
+    """Return ``{"url", "canonical_url", "guid", "gist_url"}`` for ``url``.
+
+    No request is made: an alias seen before resolves straight to its
+    canonical page's guid and gist.
+    """
+    canonical_url = page_cache.resolve(url)
+    guid = utilities.build_guid_from_url(canonical_url)
+    gist_url = utilities.get_gist_url_for_guid(guid)
+    if not gist_url and canonical_url != url:
+        # Gists made before the alias was known are keyed by the alias itself.
+        alias_guid = utilities.build_guid_from_url(url)
+        alias_gist_url = utilities.get_gist_url_for_guid(alias_guid)
+        if alias_gist_url:
+            guid, gist_url = alias_guid, alias_gist_url
+    return {
+        "url": url,
+        "canonical_url": canonical_url,
+        "guid": guid,
+        "gist_url": gist_url,
+    }
+
+
+def cached_article(article: dict) -> tuple[str, str] | None:
+    """Return the stored ``(markdown, title)`` of the article's canonical page."""
+    page = page_cache.get(article["canonical_url"])
+    return (page["markdown"], page["title"]) if page else None
+
+
+def fetch_article(article: dict) -> str:
+    """Fetch the article's HTML and re-key ``article`` by its canonical URL.
+
+    Raises ``http_cache.NotModified`` when refreshing a gist whose page is
+    unchanged. The validators to store on publishing go in ``article``.
+    """
+    html, article["validators"] = article_utils.fetch_html(
+        article["url"],
+        revalidate_for=(
+            utilities.gist_guid(article["guid"]) if article["gist_url"] else None
+        ),
+    )
+    canonical_url = article_utils.find_canonical_url(html, article["url"])
+    page_cache.add_alias(article["url"], canonical_url)
+    # An existing gist keeps its guid; otherwise key by the declared canonical.
+    if canonical_url != article["canonical_url"] and not article["gist_url"]:
+        article["canonical_url"] = canonical_url
+        article["guid"] = utilities.build_guid_from_url(canonical_url)
+        article["gist_url"] = utilities.get_gist_url_for_guid(article["guid"])
+    return html
+
+
+def store_article(article: dict, markdown: str, title: str) -> None:
+    page_cache.put(article["canonical_url"], markdown, title)
+
+
+def publish_article(
+    article: dict, markdown: str, title: str, *, prefix: str = "ART"
+) -> str | None:
+    gist_url = utilities.writeGist(
+        markdown,
+        f"{prefix}: {title or article['guid']}",
+        article["guid"],
+        update=True,
+        source_url=article["canonical_url"],
+    )
+    if gist_url and article.get("validators"):
+        http_cache.put(utilities.gist_guid(article["guid"]), article["validators"])
+    return gist_url
+
+
 def convertArticle(
     url: str,
     forceRefresh: bool,
@@ -30,29 +103,33 @@ def convertArticle(
         logger.warning("Skipping non-http URL {}", url)
         return False
 
-    unique_url = utilities.build_guid_from_url(cleaned_url)
-    gist_url = utilities.get_gist_url_for_guid(unique_url)
-    if gist_url and not forceRefresh:
-        return gist_url
-
-    try:
-        html = article_utils.fetch_html(cleaned_url)
-        markdown, title = article_utils.extract_article_markdown(
-            html, cleaned_url, include_comments=True
-        )
-    except Exception as exc:
-        logger.error("Failed to convert {} {}: {}", source_label, cleaned_url, exc)
-        return False
+    article = lookup_article(cleaned_url)
+    if article["gist_url"] and not forceRefresh:
+        return article["gist_url"]
 
-    if not markdown.strip():
-        logger.error("Empty markdown extracted from {}", cleaned_url)
-        return False
+    cached = None if forceRefresh else cached_article(article)
+    if cached:
+        markdown, title = cached
+    else:
+        try:
+            html = fetch_article(article)
+            if article["gist_url"] and not forceRefresh:
+                return article["gist_url"]
+            markdown, title = article_utils.extract_article_markdown(
+                html,
+                cleaned_url,
+                include_comments=True,
+                extract=extraction_pool.extract,
+            )
+        except http_cache.NotModified:
+            return article["gist_url"]
+        except Exception as exc:
+            logger.error("Failed to convert {} {}: {}", source_label, cleaned_url, exc)
+            return False
 
-    gist_url = utilities.writeGist(
-        markdown,
-        f"{prefix}: {title or unique_url}",
-        unique_url,
-        update=True,
-        source_url=cleaned_url,
-    )
-    return gist_url
+        if not markdown.strip():
+            logger.error("Empty markdown extracted from {}", cleaned_url)
+            return False
+        store_article(article, markdown, title)
+
+    return publish_article(article, markdown, title, prefix=prefix)
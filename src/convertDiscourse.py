@@ -1,9 +1,9 @@
 import re
 from pathlib import Path
 
-import requests
 from loguru import logger
 
+import http_cache
 import utilities
 
 
@@ -54,8 +54,13 @@ def convertDiscourse(url: str, forceRefresh: bool):
         return gist_url
 
     try:
-        response = requests.get(raw_url, timeout=20)
-        response.raise_for_status()
+        # Refreshing an existing gist only needs the body if it has changed.
+        response = http_cache.fetch(
+            raw_url,
+            revalidate_for=utilities.gist_guid(unique_url) if gist_url else None,
+        )
+    except http_cache.NotModified:
+        return gist_url
     except Exception as exc:
         logger.error(f"Failed to fetch markdown from {raw_url}: {exc}")
         return False
@@ -74,6 +79,10 @@ def convertDiscourse(url: str, forceRefresh: bool):
         update=True,
         source_url=url,
     )
+    if gist_url:
+        http_cache.put(
+            utilities.gist_guid(unique_url), http_cache.validators_from(response)
+        )
     return gist_url
 
 
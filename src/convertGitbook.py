@@ -2,9 +2,9 @@ import re
 from pathlib import Path
 from urllib.parse import urlparse
 
-import requests
 from loguru import logger
 
+import http_cache
 import utilities
 
 
@@ -51,8 +51,13 @@ def convertGitbook(url, forceRefresh):
         return gistUrl
     markdown_url = _build_markdown_url(url)
     try:
-        response = requests.get(markdown_url, timeout=20)
-        response.raise_for_status()
+        # Refreshing an existing gist only needs the body if it has changed.
+        response = http_cache.fetch(
+            markdown_url,
+            revalidate_for=utilities.gist_guid(unique_url) if gistUrl else None,
+        )
+    except http_cache.NotModified:
+        return gistUrl
     except Exception as exc:
         logger.error(f"Failed to fetch markdown from {markdown_url}: {exc}")
         return False
@@ -71,6 +76,10 @@ def convertGitbook(url, forceRefresh):
         update=True,
         source_url=url,
     )
+    if gist_url:
+        http_cache.put(
+            utilities.gist_guid(unique_url), http_cache.validators_from(response)
+        )
     return gist_url
 
 
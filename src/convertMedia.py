@@ -0,0 +1,46 @@
+from urllib.parse import urlparse
+
+from dotenv import load_dotenv
+
+import media_cache
+import utilities
+
+load_dotenv()
+
+# How each host's player takes a start offset, for linking transcript times.
+TIMESTAMP_URL_OPTIONS = {
+    "vimeo.com": {"suffix": "s"},
+    "odysee.com": {"query_param": "t"},
+    "twitch.tv": {"query_param": "t", "suffix": "s"},
+}
+
+
+def _timestamp_url(media_url):
+    host = urlparse(media_url).netloc.lower()
+    for domain, options in TIMESTAMP_URL_OPTIONS.items():
+        if host == domain or host.endswith("." + domain):
+            return utilities.build_timestamp_url(media_url, **options)
+    return utilities.build_timestamp_url(media_url)
+
+
+def convertMedia(media_url, forceRefresh):
+    inputSource = "Media"
+    mediaId = "".join(char for char in media_url if char.isalnum())
+    gistUrl = utilities.get_gist_url_for_guid(mediaId)
+    if gistUrl and not forceRefresh:
+        return gistUrl
+
+    audio_file, info_dict = media_cache.fetch_ytdlp_audio(media_url)
+    audio_chunks = utilities.chunk_mp3(audio_file)
+    transcript = utilities.transcribe_mp3(
+        audio_chunks, timestamp_url=_timestamp_url(media_url)
+    )
+    gist_url = utilities.writeGist(
+        transcript,
+        f"{inputSource}: " + info_dict.get("title", mediaId),
+        mediaId,
+        update=True,
+        source_url=media_url,
+    )
+
+    return gist_url
@@ -2,9 +2,10 @@ import time
 import random
 import os
 from dotenv import load_dotenv
-import requests
 from pathlib import Path
 
+import download_utils
+import media_cache
 import utilities
 
 load_dotenv()
@@ -19,16 +20,8 @@ def download_mp3(url):
     currentTime = time.time()
     randomNumber = str(currentTime) + "_" + str(random.randint(1000000000, 9999999999))
 
-    # Download the MP3 file
-    response = requests.get(url, allow_redirects=True)
-    response.raise_for_status()
-
-    # Save the MP3 file
     mp3_file = output_dir / f"{randomNumber}.mp3"
-    with open(mp3_file, "wb") as file:
-        file.write(response.content)
-
-    return str(mp3_file)
+    return download_utils.download_file(url, mp3_file)
 
 
 def convertMp3(mp3_url, forceRefresh):
@@ -42,9 +35,13 @@ def convertMp3(mp3_url, forceRefresh):
     if gistUrl and not forceRefresh:
         return gistUrl
 
-    mp3_file = download_mp3(mp3_url)
+    mp3_file = media_cache.fetch_audio(
+        f"url:{mp3_url}", lambda: download_mp3(mp3_url)
+    )
     audio_chunks = utilities.chunk_mp3(mp3_file)
-    transcript = utilities.transcribe_mp3(audio_chunks)
+    transcript = utilities.transcribe_mp3(
+        audio_chunks, timestamp_url=utilities.build_timestamp_url(mp3_url)
+    )
     gist_url = utilities.writeGist(
         transcript,
         f"{inputSource}: " + name,
@@ -1,11 +1,11 @@
 import time
-from pydub import AudioSegment
 import random
 import os
 from dotenv import load_dotenv
-import requests
 from pathlib import Path
 
+import audio_utils
+import media_cache
 import utilities
 
 load_dotenv()
@@ -13,29 +13,14 @@ load_dotenv()
 REPO_ROOT = Path(__file__).resolve().parents[1]
 
 
-def download_mp4_and_convert_to_mp3(url):
+def download_mp4_audio(url):
     # Set the output directory relative to the script's location
     output_dir = REPO_ROOT / "tmp"
     os.makedirs(output_dir, exist_ok=True)
     currentTime = time.time()
     randomNumber = str(currentTime) + "_" + str(random.randint(1000000000, 9999999999))
 
-    # Download the MP4 file
-    response = requests.get(url, allow_redirects=True)
-    response.raise_for_status()
-
-    # Save the MP4 file
-    mp4_file = output_dir / f"{randomNumber}.mp4"
-    with open(mp4_file, "wb") as file:
-        file.write(response.content)
-
-    # Convert MP4 to MP3 using pydub
-    audio = AudioSegment.from_file(mp4_file, format="mp4")
-    mp3_file = output_dir / f"{randomNumber}.mp3"
-    audio.export(mp3_file, format="mp3")
-
-    os.remove(mp4_file)
-    return str(mp3_file)
+    return audio_utils.extract_remote_audio([url], str(output_dir / randomNumber))
 
 
 def convertMp4(mp4_url, forceRefresh):
@@ -47,9 +32,13 @@ def convertMp4(mp4_url, forceRefresh):
     gistUrl = utilities.get_gist_url_for_guid(mp4Id)
     if gistUrl and not forceRefresh:
         return gistUrl
-    mp3_file = download_mp4_and_convert_to_mp3(mp4_url)
-    audio_chunks = utilities.chunk_mp3(mp3_file)
-    transcript = utilities.transcribe_mp3(audio_chunks)
+    audio_file = media_cache.fetch_audio(
+        f"url:{mp4_url}", lambda: download_mp4_audio(mp4_url)
+    )
+    audio_chunks = utilities.chunk_mp3(audio_file)
+    transcript = utilities.transcribe_mp3(
+        audio_chunks, timestamp_url=utilities.build_timestamp_url(mp4_url)
+    )
     gist_url = utilities.writeGist(
         transcript,
         f"{inputSource}: " + name,
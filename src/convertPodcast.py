@@ -9,6 +9,8 @@ from html import unescape
 from pathlib import Path
 from urllib.parse import urlparse
 
+import download_utils
+import media_cache
 import utilities
 
 load_dotenv()
@@ -59,38 +61,27 @@ def get_podcast_episode_info(url):
     return None, None
 
 
-def download_podcast_episode(url):
+def download_podcast_episode(url, audio_url):
     # Set the output directory relative to the script's location
     output_dir = REPO_ROOT / "tmp"
     os.makedirs(output_dir, exist_ok=True)
     currentTime = time.time()
     randomNumber = str(currentTime) + "_" + str(random.randint(1000000000, 9999999999))
 
-    # Get the episode info
-    audio_url, title = get_podcast_episode_info(url)
-
-    if not audio_url:
-        raise ValueError(f"Could not find audio URL for {url}")
-
-    # Download the podcast episode
-    response = requests.get(
-        audio_url,
-        allow_redirects=True,
-        headers={"User-Agent": "Mozilla/5.0", "Referer": url},
-    )
-    response.raise_for_status()
-
     audio_path = Path(urlparse(audio_url).path)
     audio_ext = audio_path.suffix.lower().lstrip(".")
     if audio_ext not in {"mp3", "m4a", "mp4"}:
         raise ValueError(f"Unsupported podcast audio extension: {audio_ext or 'none'}")
 
-    # Save the episode audio to a file
+    # Download the podcast episode
     audio_file = output_dir / f"{randomNumber}.{audio_ext}"
-    with open(audio_file, "wb") as file:
-        file.write(response.content)
+    download_utils.download_file(
+        audio_url,
+        audio_file,
+        headers={"User-Agent": "Mozilla/5.0", "Referer": url},
+    )
 
-    return str(audio_file), title
+    return str(audio_file)
 
 
 def convertPodcast(episode_url, forceRefresh):
@@ -101,7 +92,13 @@ def convertPodcast(episode_url, forceRefresh):
     gistUrl = utilities.get_gist_url_for_guid(episodeId)
     if gistUrl and not forceRefresh:
         return gistUrl
-    mp3_file, title = download_podcast_episode(episode_url)
+    audio_url, title = get_podcast_episode_info(episode_url)
+    if not audio_url:
+        raise ValueError(f"Could not find audio URL for {episode_url}")
+    mp3_file = media_cache.fetch_audio(
+        f"podcast:{episodeId}",
+        lambda: download_podcast_episode(episode_url, audio_url),
+    )
     audio_chunks = utilities.chunk_mp3(mp3_file)
     transcript = utilities.transcribe_mp3(audio_chunks)
     gist_url = utilities.writeGist(
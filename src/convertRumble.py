@@ -1,9 +1,7 @@
-import time
-import random
 from dotenv import load_dotenv
 from pathlib import Path
-import yt_dlp
 
+import media_cache
 import utilities
 
 load_dotenv()
@@ -11,37 +9,6 @@ load_dotenv()
 REPO_ROOT = Path(__file__).resolve().parents[1]
 
 
-def download_rumble_video_as_mp3(url):
-    # Set the output directory relative to the script's location
-    output_dir = REPO_ROOT / "tmp"
-    os.makedirs(output_dir, exist_ok=True)
-    currentTime = time.time()
-    randomNumber = str(currentTime) + "_" + str(random.randint(1000000000, 9999999999))
-
-    # Configure yt-dlp options
-    ydl_opts = {
-        "format": "mp4-480p",
-        "postprocessors": [
-            {
-                "key": "FFmpegExtractAudio",
-                "preferredcodec": "mp3",
-                "preferredquality": "192",
-            }
-        ],
-        "outtmpl": str(output_dir / f"{randomNumber}.%(ext)s"),
-    }
-
-    # Download the video using yt-dlp
-    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-        info_dict = ydl.extract_info(url, download=False)
-        title = info_dict["title"]
-        info_dict = ydl.extract_info(url, download=True)
-
-    # Get the downloaded MP3 file path
-    mp3_file = output_dir / f"{randomNumber}.mp3"
-    return str(mp3_file), title
-
-
 #@pysnooper.snoop()
 def convertRumble(video_url, forceRefresh):
     inputSource = "Rumble"
@@ -50,9 +17,13 @@ def convertRumble(video_url, forceRefresh):
     if gistUrl and not forceRefresh:
         return gistUrl
 
-    mp3_file, title = download_rumble_video_as_mp3(video_url)
-    audio_chunks = utilities.chunk_mp3(mp3_file)
-    transcript = utilities.transcribe_mp3(audio_chunks)
+    audio_file, info_dict = media_cache.fetch_ytdlp_audio(video_url)
+    title = info_dict["title"]
+    audio_chunks = utilities.chunk_mp3(audio_file)
+    transcript = utilities.transcribe_mp3(
+        audio_chunks,
+        timestamp_url=utilities.build_timestamp_url(video_url, query_param="start"),
+    )
     gist_url = utilities.writeGist(
         transcript,
         f"{inputSource}: " + title,
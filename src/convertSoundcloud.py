@@ -3,9 +3,12 @@ import os
 import random
 from pathlib import Path
 
+import requests
 from dotenv import load_dotenv
 from sclib import SoundcloudAPI, Track
 
+import audio_utils
+import media_cache
 import utilities
 
 load_dotenv()
@@ -13,28 +16,48 @@ load_dotenv()
 REPO_ROOT = Path(__file__).resolve().parents[1]
 
 
-def download_podcast_episode(url):
+def resolve_track(url):
     api = SoundcloudAPI()
     track = api.resolve(url)
+    if not isinstance(track, Track):
+        return None
     durationSeconds = track.full_duration / 1000
     if durationSeconds < 600:
-        return None, None
+        return None
+    return track
 
-    if not isinstance(track, Track):
-        return None, None
 
+def get_stream_url(track):
+    """Return the track's HLS playlist, or its progressive stream if it has none."""
+    transcodings = sorted(
+        track.media["transcodings"],
+        key=lambda transcoding: transcoding["format"]["protocol"] != "hls",
+    )
+    if not transcodings:
+        return None
+    response = requests.get(
+        transcodings[0]["url"],
+        params={"client_id": track.client.client_id},
+        timeout=30,
+    )
+    response.raise_for_status()
+    return response.json()["url"]
+
+
+def stream_track_chunks(track, media_id):
     # Set the output directory relative to the script's location
     output_dir = REPO_ROOT / "tmp"
     os.makedirs(output_dir, exist_ok=True)
     currentTime = time.time()
     randomNumber = str(currentTime) + "_" + str(random.randint(1000000000, 9999999999))
 
-    # Save the episode audio to a file
-    mp3_file = output_dir / f"{randomNumber}.mp3"
-    with open(mp3_file, "wb+") as file:
-        track.write_mp3_to(file)
-
-    return str(mp3_file), track.title
+    stream_url = get_stream_url(track)
+    if stream_url is None:
+        return
+    full_file = yield from audio_utils.stream_segments(
+        stream_url, str(output_dir / randomNumber), keep_copy=True
+    )
+    os.remove(media_cache.put(media_id, full_file))
 
 
 def convertSoundcloud(episode_url, forceRefresh):
@@ -42,15 +65,26 @@ def convertSoundcloud(episode_url, forceRefresh):
     gistUrl = utilities.get_gist_url_for_guid(episodeId)
     if gistUrl and not forceRefresh:
         return gistUrl
-    mp3_file, title = download_podcast_episode(episode_url)
-    audio_chunks = utilities.chunk_mp3(mp3_file)
-    if not audio_chunks:
+    # Resolving only fetches metadata, so short tracks are skipped before any audio.
+    track = resolve_track(episode_url)
+    if track is None:
         return None
+    media_id = f"soundcloud:{track.id}"
+    cached_file = media_cache.get(media_id)
+    if cached_file:
+        audio_chunks = utilities.chunk_mp3(cached_file)
+    else:
+        # Transcription starts on the first chunk while the rest still downloads.
+        audio_chunks = stream_track_chunks(track, media_id)
     inputSource = "SC"
-    transcript = utilities.transcribe_mp3(audio_chunks)
+    transcript = utilities.transcribe_mp3(
+        audio_chunks, timestamp_url=utilities.build_timestamp_url(episode_url)
+    )
+    if not transcript:
+        return None
     gist_url = utilities.writeGist(
         transcript,
-        f"{inputSource}: " + title,
+        f"{inputSource}: " + track.title,
         episodeId,
         update=True,
         source_url=episode_url,
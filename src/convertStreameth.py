@@ -1,5 +1,4 @@
 import time
-from pydub import AudioSegment
 import re
 import random
 import os
@@ -7,6 +6,8 @@ from dotenv import load_dotenv
 from pathlib import Path
 import requests
 
+import audio_utils
+import media_cache
 import utilities
 
 load_dotenv()
@@ -23,52 +24,54 @@ def getMp4UrlAndName(url):
     match = re.search(pattern, text)
     mp4Url = match.group(0) if match else ""
     print("mp4Url", mp4Url)
+    hls_match = re.search(r"https:\/\/[^\"'\s]+\.m3u8", text)
+    if hls_match:
+        hlsUrl = hls_match.group(0)
+    elif mp4Url:
+        # Catalyst VODs serve an HLS master next to the static MP4 renditions.
+        hlsUrl = mp4Url.rsplit("/", 1)[0] + "/index.m3u8"
+    else:
+        hlsUrl = ""
 
     # Find the second substring between '<title>' and '| StreamETH</title>'
     start_index = text.find("<title>") + len("<title>")
     end_index = text.find("| StreamETH</title>", start_index)
     name = text[start_index:end_index]
 
-    return mp4Url, name
+    return mp4Url, hlsUrl, name
 
 
-def download_mp4_and_convert_to_mp3(url):
+def download_audio(mp4Url, hlsUrl):
     # Set the output directory relative to the script's location
     output_dir = REPO_ROOT / "tmp"
     os.makedirs(output_dir, exist_ok=True)
     currentTime = time.time()
     randomNumber = str(currentTime) + "_" + str(random.randint(1000000000, 9999999999))
 
-    # Download the MP4 file
-    response = requests.get(url, allow_redirects=True)
-    response.raise_for_status()
-
-    # Save the MP4 file
-    mp4_file = output_dir / f"{randomNumber}.mp4"
-    with open(mp4_file, "wb") as file:
-        file.write(response.content)
-
-    # Convert MP4 to MP3 using pydub
-    audio = AudioSegment.from_file(mp4_file, format="mp4")
-    mp3_file = output_dir / f"{randomNumber}.mp3"
-    audio.export(mp3_file, format="mp3")
-
-    os.remove(mp4_file)
-
-    return str(mp3_file)
+    # The HLS audio (or lowest) rendition is a fraction of the 1080p MP4's size.
+    sources = [url for url in (hlsUrl, mp4Url) if url]
+    return audio_utils.extract_remote_audio(sources, str(output_dir / randomNumber))
 
 
 def convertStreameth(streamethUrl, forceRefresh):
     inputSource = "StreamEth"
-    mp4Url, name = getMp4UrlAndName(streamethUrl)
-    id = "".join(char for char in mp4Url if char.isalnum())
+    mp4Url, hlsUrl, name = getMp4UrlAndName(streamethUrl)
+    # Talks with only an HLS stream have no mp4 to identify them by.
+    mediaUrl = mp4Url or hlsUrl
+    if not mediaUrl:
+        raise ValueError(f"No video found on {streamethUrl}")
+    id = "".join(char for char in mediaUrl if char.isalnum())
     id += "_" + "".join(char for char in name if char.isalnum())
     gistUrl = utilities.get_gist_url_for_guid(id)
     if gistUrl and not forceRefresh:
         return gistUrl
-    mp3_file = download_mp4_and_convert_to_mp3(mp4Url)
-    audio_chunks = utilities.chunk_mp3(mp3_file)
-    transcript = utilities.transcribe_mp3(audio_chunks)
+    audio_file = media_cache.fetch_audio(
+        f"url:{mediaUrl}", lambda: download_audio(mp4Url, hlsUrl)
+    )
+    audio_chunks = utilities.chunk_mp3(audio_file)
+    transcript = utilities.transcribe_mp3(
+        audio_chunks, timestamp_url=utilities.build_timestamp_url(streamethUrl)
+    )
     gist_url = utilities.writeGist(
         transcript,
         f"{inputSource}: " + name,
@@ -0,0 +1,231 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import requests
+from loguru import logger
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+DOWNLOAD_DIR = REPO_ROOT / "tmp"
+
+RANGE_CHUNK_BYTES = 8 * 1024 * 1024
+# Below this a single connection is as fast as splitting the file up.
+PARALLEL_MIN_BYTES = 2 * RANGE_CHUNK_BYTES
+DOWNLOAD_MAX_WORKERS = 8
+DOWNLOAD_MAX_RETRIES = 3
+DOWNLOAD_RETRY_BACKOFF_SECONDS = 2
+READ_BYTES = 1024 * 1024
+TIMEOUT_SECONDS = 30
+
+_thread_local = threading.local()
+# One lock per URL hash, so concurrent downloads of a URL share no part file.
+_url_locks: dict[str, threading.Lock] = {}
+_url_locks_lock = threading.Lock()
+
+
+def _session() -> requests.Session:
+    # requests sessions are not thread-safe; give each download thread its own.
+    if not hasattr(_thread_local, "session"):
+        _thread_local.session = requests.Session()
+    return _thread_local.session
+
+
+def _probe(url: str, headers: dict) -> dict:
+    """Ask for the first byte to learn the size and whether ranges are honoured."""
+    with _session().get(
+        url,
+        headers={**headers, "Range": "bytes=0-0"},
+        stream=True,
+        allow_redirects=True,
+        timeout=TIMEOUT_SECONDS,
+    ) as response:
+        response.raise_for_status()
+        content_range = response.headers.get("Content-Range", "")
+        total = None
+        if response.status_code == 206 and "/" in content_range:
+            size = content_range.rsplit("/", 1)[1]
+            total = int(size) if size.isdigit() else None
+        elif response.headers.get("Content-Length", "").isdigit():
+            total = int(response.headers["Content-Length"])
+        return {
+            "url": response.url,
+            "total": total,
+            "ranges": response.status_code == 206 and total is not None,
+            "validator": response.headers.get("ETag")
+            or response.headers.get("Last-Modified"),
+        }
+
+
+def _load_state(state_path: Path, probe: dict) -> set[int]:
+    try:
+        state = json.loads(state_path.read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        return set()
+    # Only resume if the remote file is the same one the partial came from.
+    if (state.get("total"), state.get("validator")) != (
+        probe["total"],
+        probe["validator"],
+    ):
+        return set()
+    return set(state.get("done", []))
+
+
+def _save_state(state_path: Path, probe: dict, done: set[int]) -> None:
+    tmp_path = state_path.with_suffix(".tmp")
+    tmp_path.write_text(
+        json.dumps(
+            {
+                "total": probe["total"],
+                "validator": probe["validator"],
+                "done": sorted(done),
+            }
+        )
+    )
+    os.replace(tmp_path, state_path)
+
+
+def _fetch_range(url: str, headers: dict, fd: int, start: int, end: int) -> None:
+    for attempt in range(1, DOWNLOAD_MAX_RETRIES + 1):
+        offset = start
+        try:
+            with _session().get(
+                url,
+                headers={**headers, "Range": f"bytes={start}-{end}"},
+                stream=True,
+                timeout=TIMEOUT_SECONDS,
+            ) as response:
+                if response.status_code != 206:
+                    raise requests.HTTPError(
+                        f"Range {start}-{end} answered with {response.status_code}"
+                    )
+                for data in response.iter_content(READ_BYTES):
+                    os.pwrite(fd, data, offset)
+                    offset += len(data)
+            if offset != end + 1:
+                raise requests.HTTPError(
+                    f"Range {start}-{end} ended after {offset - start} bytes"
+                )
+            return
+        except requests.RequestException as exc:
+            logger.warning(
+                "Range {}-{} failed (attempt {}/{}): {}",
+                start,
+                end,
+                attempt,
+                DOWNLOAD_MAX_RETRIES,
+                exc,
+            )
+            if attempt == DOWNLOAD_MAX_RETRIES:
+                raise
+            time.sleep(DOWNLOAD_RETRY_BACKOFF_SECONDS * attempt)
+
+
+def _download_ranges(
+    probe: dict, headers: dict, part_path: Path, state_path: Path, max_workers: int
+) -> None:
+    total = probe["total"]
+    ranges = [
+        (start, min(start + RANGE_CHUNK_BYTES, total) - 1)
+        for start in range(0, total, RANGE_CHUNK_BYTES)
+    ]
+    done = _load_state(state_path, probe) if part_path.exists() else set()
+    if done:
+        logger.info("Resuming download with {}/{} ranges done", len(done), len(ranges))
+    lock = threading.Lock()
+    fd = os.open(part_path, os.O_RDWR | os.O_CREAT)
+    try:
+        os.ftruncate(fd, total)
+
+        def fetch(index: int) -> None:
+            start, end = ranges[index]
+            _fetch_range(probe["url"], headers, fd, start, end)
+            with lock:
+                done.add(index)
+                _save_state(state_path, probe, done)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(fetch, index)
+                for index in range(len(ranges))
+                if index not in done
+            ]
+            for future in futures:
+                future.result()
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _download_single(url: str, headers: dict, part_path: Path) -> int:
+    with _session().get(
+        url, headers=headers, stream=True, allow_redirects=True, timeout=TIMEOUT_SECONDS
+    ) as response:
+        response.raise_for_status()
+        expected = response.headers.get("Content-Length")
+        written = 0
+        with open(part_path, "wb") as file:
+            for data in response.iter_content(READ_BYTES):
+                file.write(data)
+                written += len(data)
+    # Content-Length is the encoded size; only trust it for identity responses.
+    if expected and not response.headers.get("Content-Encoding"):
+        if written != int(expected):
+            raise IOError(f"Downloaded {written} of {expected} bytes from {url}")
+    return written
+
+
+def _url_lock(url_hash: str) -> threading.Lock:
+    with _url_locks_lock:
+        return _url_locks.setdefault(url_hash, threading.Lock())
+
+
+def download_file(
+    url: str,
+    output_file: str | Path,
+    *,
+    headers: dict | None = None,
+    max_workers: int = DOWNLOAD_MAX_WORKERS,
+) -> str:
+    """Download ``url`` to ``output_file``, in parallel byte ranges when possible.
+
+    Partial downloads live in ``tmp/`` under a name derived from the URL, so an
+    interrupted download of the same file resumes from the ranges already
+    fetched; ``utilities.deleteMp3sOlderThan`` clears abandoned ones. The final
+    size is checked against the server's before the file is moved into place.
+    """
+    # Byte offsets must refer to the file itself, not a compressed transfer.
+    headers = {"Accept-Encoding": "identity", **(headers or {})}
+    DOWNLOAD_DIR.mkdir(exist_ok=True)
+    url_hash = hashlib.sha256(url.encode("utf-8")).hexdigest()[:16]
+    part_path = DOWNLOAD_DIR / f"{url_hash}.part"
+    state_path = DOWNLOAD_DIR / f"{url_hash}.part.json"
+
+    started = time.monotonic()
+    with _url_lock(url_hash):
+        probe = _probe(url, headers)
+        parallel = probe["ranges"] and probe["total"] >= PARALLEL_MIN_BYTES
+        if parallel:
+            _download_ranges(probe, headers, part_path, state_path, max_workers)
+            size = part_path.stat().st_size
+            if size != probe["total"]:
+                raise IOError(
+                    f"Downloaded {size} of {probe['total']} bytes from {url}"
+                )
+        else:
+            size = _download_single(probe["url"], headers, part_path)
+
+        os.replace(part_path, output_file)
+        state_path.unlink(missing_ok=True)
+    elapsed = time.monotonic() - started
+    logger.info(
+        "Downloaded {} ({:.1f} MB in {:.1f}s, {})",
+        url,
+        size / 1e6,
+        elapsed,
+        "parallel ranges" if parallel else "single connection",
+    )
+    return str(output_file)
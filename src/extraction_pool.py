@@ -0,0 +1,128 @@
+import atexit
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+
+from loguru import logger
+
+import article_utils
+import extraction_worker
+
+# 0 always extracts in the calling process.
+EXTRACTION_MAX_WORKERS = int(
+    os.getenv("EXTRACTION_MAX_WORKERS", min(4, os.cpu_count() or 1))
+)
+
+_executor: ProcessPoolExecutor | None = None
+_executor_lock = threading.Lock()
+_in_flight = 0
+_in_flight_lock = threading.Lock()
+
+
+@contextmanager
+def _slim_main():
+    # Spawned workers re-import the parent's __main__; point it at the worker
+    # module while they start so they skip the CLI and its converters.
+    main = sys.modules["__main__"]
+    sys.modules["__main__"] = extraction_worker
+    try:
+        yield
+    finally:
+        sys.modules["__main__"] = main
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # Spawn: the caller usually has fetch threads running, which fork would copy.
+            executor = ProcessPoolExecutor(
+                max_workers=EXTRACTION_MAX_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            # Workers start on submit; start them all now, under the slim main.
+            with _slim_main():
+                for _ in range(EXTRACTION_MAX_WORKERS):
+                    executor.submit(extraction_worker.warm)
+            _executor = executor
+        return _executor
+
+
+def _reset_executor(broken: ProcessPoolExecutor) -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is broken:
+            _executor = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown() -> None:
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+atexit.register(shutdown)
+
+
+def _finished(_: Future | None = None) -> None:
+    global _in_flight
+    with _in_flight_lock:
+        _in_flight -= 1
+
+
+def submit(html: str, base_url: str | None) -> Future:
+    """Queue extraction of ``html``; the future yields ``(markdown, title, cpu_seconds)``.
+
+    A lone extraction runs in the calling process, so converting one article
+    never waits for workers to start. Only extractions that overlap another
+    one, as in batch and multi-URL runs, go to the worker pool.
+    """
+    global _in_flight
+    with _in_flight_lock:
+        in_process = EXTRACTION_MAX_WORKERS == 0 or _in_flight == 0
+        _in_flight += 1
+
+    if in_process:
+        future = Future()
+        started = time.process_time()
+        try:
+            markdown, title = article_utils.extract_main_markdown(html, base_url)
+            future.set_result((markdown, title, time.process_time() - started))
+        except Exception as exc:
+            future.set_exception(exc)
+        finally:
+            _finished()
+        return future
+
+    # The str is pickled through the pool's pipe once; encoding it into shared
+    # memory and decoding it again in the worker cost more than that copy.
+    executor = _get_executor()
+    try:
+        future = executor.submit(extraction_worker.extract, html, base_url)
+    except BrokenProcessPool:
+        _finished()
+        _reset_executor(executor)
+        raise
+
+    def release(done: Future) -> None:
+        _finished()
+        if isinstance(done.exception(), BrokenProcessPool):
+            logger.error("Extraction worker died; the pool will be restarted")
+            _reset_executor(executor)
+
+    future.add_done_callback(release)
+    return future
+
+
+def extract(html: str, base_url: str | None) -> tuple[str, str]:
+    """``article_utils.extract_main_markdown``, in the worker pool if others are running."""
+    markdown, title, _ = submit(html, base_url).result()
+    return markdown, title
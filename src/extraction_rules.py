@@ -0,0 +1,135 @@
+import json
+import os
+import threading
+from pathlib import Path
+from urllib.parse import urlparse
+
+from loguru import logger
+from lxml.html import HtmlElement
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+RULES_PATH = REPO_ROOT / "data" / "extraction_rules.json"
+RULES_PATH.parent.mkdir(parents=True, exist_ok=True)
+
+# Declared content selectors, matched against the host and its parent domains.
+DEFAULT_RULES = {
+    "substack.com": "//div[contains(@class, 'available-content')]",
+    "lesswrong.com": "//div[contains(@class, 'PostsPage-postContent')]",
+    "scribe.rip": "//article",
+}
+# A selector whose match has less text than this is treated as a miss.
+MIN_CONTENT_CHARS = 200
+# A learned selector must cover most of the text readability picked.
+MIN_LEARNED_COVERAGE = 0.8
+
+_lock = threading.Lock()
+_learned: dict[str, str] = {}
+_learned_mtime: float | None = None
+
+
+def _host(url: str | None) -> str:
+    host = urlparse(url or "").netloc.lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def _load_learned() -> dict[str, str]:
+    """Return learned rules, re-reading the file if another process changed it."""
+    global _learned, _learned_mtime
+    try:
+        mtime = RULES_PATH.stat().st_mtime
+    except FileNotFoundError:
+        return _learned
+    if mtime != _learned_mtime:
+        try:
+            _learned = json.loads(RULES_PATH.read_text())
+        except json.JSONDecodeError:
+            _learned = {}
+        _learned_mtime = mtime
+    return _learned
+
+
+def _save_learned(host: str, xpath: str | None) -> None:
+    with _lock:
+        learned = dict(_load_learned())
+        if xpath is None:
+            learned.pop(host, None)
+        else:
+            learned[host] = xpath
+        # Last writer wins between processes; a lost rule is simply relearned.
+        tmp_path = RULES_PATH.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_text(json.dumps(learned, indent=4, sort_keys=True))
+        os.replace(tmp_path, RULES_PATH)
+
+
+def rule_for(url: str | None) -> str | None:
+    host = _host(url)
+    if not host:
+        return None
+    with _lock:
+        learned = _load_learned().get(host)
+    if learned:
+        return learned
+    parts = host.split(".")
+    for index in range(len(parts) - 1):
+        rule = DEFAULT_RULES.get(".".join(parts[index:]))
+        if rule:
+            return rule
+    return None
+
+
+def match(tree: HtmlElement, url: str | None) -> HtmlElement | None:
+    """Return the one content node the host's rule selects, if it holds an article.
+
+    A learned rule that misses is forgotten, so readability can learn a new one.
+    """
+    rule = rule_for(url)
+    if not rule:
+        return None
+    nodes = tree.xpath(rule)
+    if len(nodes) == 1 and len(nodes[0].text_content().strip()) >= MIN_CONTENT_CHARS:
+        return nodes[0]
+    logger.debug("Extraction rule {} missed on {} ({} matches)", rule, url, len(nodes))
+    with _lock:
+        learned = _load_learned().get(_host(url)) == rule
+    if learned:
+        forget(url)
+    return None
+
+
+def _selector(element: HtmlElement) -> str | None:
+    for attribute in ("id", "class"):
+        value = element.get(attribute)
+        if value and '"' not in value:
+            return f'//{element.tag}[@{attribute}="{value}"]'
+    return None
+
+
+def learn(tree: HtmlElement, candidate: HtmlElement, url: str | None) -> None:
+    """Remember a selector for readability's ``candidate`` if it is unambiguous.
+
+    ``candidate`` comes from readability's cleaned copy, so the selector is
+    built from its id or class and checked against ``tree``: it must match
+    exactly one node that carries most of the candidate's text.
+    """
+    host = _host(url)
+    selector = _selector(candidate)
+    if not host or not selector:
+        return
+    nodes = tree.xpath(selector)
+    if len(nodes) != 1:
+        return
+    candidate_chars = len(candidate.text_content().strip())
+    if len(nodes[0].text_content().strip()) < candidate_chars * MIN_LEARNED_COVERAGE:
+        return
+    if _load_learned().get(host) != selector:
+        logger.info("Learned extraction rule {} for {}", selector, host)
+        _save_learned(host, selector)
+
+
+def forget(url: str | None) -> None:
+    host = _host(url)
+    with _lock:
+        known = host in _load_learned()
+    if known:
+        logger.info("Forgetting extraction rule for {}", host)
+        _save_learned(host, None)
@@ -0,0 +1,25 @@
+"""Entry module for ``extraction_pool`` workers.
+
+Spawned workers import this as their ``__main__`` instead of the CLI that
+started them, so they load only what extraction needs.
+"""
+
+import time
+
+import article_utils
+
+
+def warm() -> None:
+    # Pay for lxml/readability/html2text imports once per worker, not per page.
+    import html2text  # noqa: F401
+    import readability  # noqa: F401
+
+
+def extract(html: str, base_url: str | None) -> tuple[str, str, float]:
+    started = time.process_time()
+    try:
+        markdown, title = article_utils.extract_main_markdown(html, base_url)
+    except Exception as exc:
+        # lxml errors carry an unpicklable error log; send back their message.
+        raise ValueError(f"{type(exc).__name__}: {exc}") from None
+    return markdown, title, time.process_time() - started
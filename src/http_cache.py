@@ -0,0 +1,134 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+import requests
+from loguru import logger
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+HTTP_CACHE_DIR = REPO_ROOT / "data" / "http_cache"
+HTTP_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+
+
+class NotModified(Exception):
+    """The resource is unchanged since its validators were stored."""
+
+
+# Validators are stored per gist guid (after the summarise suffix), not per URL:
+# the same page can back a plain and a summary gist, each refreshed separately.
+def _path_for(gist_guid: str) -> Path:
+    key = hashlib.sha256(gist_guid.encode("utf-8")).hexdigest()
+    return HTTP_CACHE_DIR / key[:2] / f"{key}.json"
+
+
+def _body_hash(body: bytes) -> str:
+    return hashlib.sha256(body).hexdigest()
+
+
+def get_validators(gist_guid: str) -> dict | None:
+    try:
+        return json.loads(_path_for(gist_guid).read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def conditional_headers(gist_guid: str) -> dict:
+    validators = get_validators(gist_guid) or {}
+    headers = {}
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+    return headers
+
+
+def validators_from(response: requests.Response) -> dict:
+    return {
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+        "body_sha256": _body_hash(response.content),
+    }
+
+
+def put(gist_guid: str, validators: dict) -> None:
+    """Store ``validators`` for the gist they built; call once it is published."""
+    path = _path_for(gist_guid)
+    path.parent.mkdir(exist_ok=True)
+    tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp_path.write_text(json.dumps({"gist_guid": gist_guid, **validators}))
+    os.replace(tmp_path, path)
+
+
+def _read_capped(
+    response: requests.Response, url: str, max_bytes: int | None, deadline: float
+) -> bytes:
+    content_length = response.headers.get("Content-Length", "")
+    if max_bytes is not None and content_length.isdigit():
+        if int(content_length) > max_bytes:
+            raise ValueError(f"{url} is {content_length} bytes, over {max_bytes}")
+    body = bytearray()
+    # read1 returns whatever has arrived, so a trickling body still hits the deadline.
+    while chunk := response.raw.read1(64 * 1024, decode_content=True):
+        body += chunk
+        if max_bytes is not None and len(body) > max_bytes:
+            raise ValueError(f"{url} is over {max_bytes} bytes")
+        if time.monotonic() > deadline:
+            raise ValueError(f"{url} took too long to download")
+    return bytes(body)
+
+
+def fetch(
+    url: str,
+    *,
+    revalidate_for: str | None = None,
+    headers: dict | None = None,
+    timeout: int = 20,
+    max_bytes: int | None = None,
+    content_types: tuple[str, ...] | None = None,
+) -> requests.Response:
+    """GET ``url``, raising ``NotModified`` if it is unchanged for a gist.
+
+    ``revalidate_for`` is the guid of an existing gist built from ``url``; pass
+    it only when that gist exists. The validators stored for it are sent as
+    conditional headers, and a 304, or a 200 whose body hashes the same as
+    last time (servers that ignore validators), counts as unchanged.
+
+    With ``max_bytes`` or ``content_types`` the body is streamed: a response
+    whose Content-Type is not listed is rejected before any of it is read, and
+    one that grows past ``max_bytes`` or ``timeout`` seconds is abandoned
+    (``ValueError``). ``response.content`` holds the body either way.
+    """
+    request_headers = dict(headers or {})
+    if revalidate_for:
+        request_headers.update(conditional_headers(revalidate_for))
+    stream = max_bytes is not None or content_types is not None
+    started = time.monotonic()
+    response = requests.get(
+        url, headers=request_headers, timeout=timeout, stream=stream
+    )
+    # Closing releases the connection when a streamed body is abandoned.
+    with response:
+        if revalidate_for and response.status_code == 304:
+            logger.info("{} not modified (304)", url)
+            raise NotModified(url)
+        response.raise_for_status()
+        if stream:
+            content_type = response.headers.get("Content-Type", "")
+            mime_type = content_type.split(";", 1)[0].strip().lower()
+            if content_types and mime_type and mime_type not in content_types:
+                raise ValueError(
+                    f"{url} is {mime_type}, not {' or '.join(content_types)}"
+                )
+            # requests fills this in the same way when it reads the body itself.
+            response._content = _read_capped(
+                response, url, max_bytes, started + timeout
+            )
+    if revalidate_for:
+        stored = get_validators(revalidate_for) or {}
+        if stored.get("body_sha256") == _body_hash(response.content):
+            logger.info("{} not modified (same body)", url)
+            raise NotModified(url)
+    return response
@@ -8,10 +8,12 @@ import pyperclip
 from tkinter import Tk, messagebox
 import webbrowser
 
+import article_batch
 from convertArticle import convertArticle
 from convertDiscord import convertDiscord
 from convertDiscourse import convertDiscourse
 from convertGitbook import convertGitbook
+from convertMedia import convertMedia
 from convertMedium import convertMedium as convertMediumArticle
 from convertMp3 import convertMp3
 from convertMp4 import convertMp4
@@ -104,6 +106,9 @@ conversion_functions = {
     "podcasts.apple.com": {"function": convertPodcast, "alwaysConvert": False},
     "soundcloud.com": {"function": convertSoundcloud, "alwaysConvert": False},
     "streameth.org": {"function": convertStreameth, "alwaysConvert": False},
+    "vimeo.com": {"function": convertMedia, "alwaysConvert": False},
+    "odysee.com": {"function": convertMedia, "alwaysConvert": False},
+    "twitch.tv/videos": {"function": convertMedia, "alwaysConvert": False},
     "docs.": {"function": convertGitbook, "alwaysConvert": True},
     "/status/": {"function": convertTwitter, "alwaysConvert": True},
     "docs.google.com/document/": {
@@ -169,6 +174,9 @@ def process_url(
         open_in_browser(originalUrl)
         return None
     else:
+        if url == utilities.SUMMARY_QUEUED:
+            print(f"Queued {originalUrl} for batch summarisation")
+            url = None
         if openInBrowser:
             if url:
                 return url
@@ -185,8 +193,12 @@ def main(
     summarise=False,
     forceNoConvert=False,
     forceRefreshAll=False,
+    batchSummarise=False,
+    streamSummary=False,
 ):
     utilities.set_default_summarise(summarise)
+    utilities.set_default_batch_summarise(batchSummarise)
+    utilities.set_default_stream_summarise(streamSummary)
     textFromClipboard = not bool(text)
     selected_text = get_selected_text() if textFromClipboard else text
     if selected_text is None:
@@ -245,6 +257,16 @@ def cli():
         action="store_true",
         help="Summarize markdown before writing gists.",
     )
+    parser.add_argument(
+        "--batch-summarise",
+        action="store_true",
+        help="Queue uncached summaries for the OpenAI Batch API instead of writing gists now.",
+    )
+    parser.add_argument(
+        "--stream-summary",
+        action="store_true",
+        help="With --summarise, publish the gist immediately and stream the summary into it.",
+    )
     parser.add_argument(
         "--no-open",
         action="store_true",
@@ -260,8 +282,20 @@ def cli():
         action="store_true",
         help="Force refresh for all converters (equivalent to adding ###).",
     )
+    parser.add_argument(
+        "--batch",
+        metavar="SOURCE",
+        help="Convert every article in a URL list, OPML export or RSS/Atom feed (path or URL).",
+    )
     args = parser.parse_args()
 
+    if args.batch:
+        utilities.set_default_summarise(args.summarise)
+        utilities.set_default_batch_summarise(args.batch_summarise)
+        results = article_batch.run(args.batch, force_refresh=args.force_refresh)
+        article_batch.print_results(results)
+        return
+
     main(
         args.text,
         openInBrowser=not args.no_open,
@@ -269,6 +303,8 @@ def cli():
         summarise=args.summarise,
         forceNoConvert=args.force_no_convert,
         forceRefreshAll=args.force_refresh,
+        batchSummarise=args.batch_summarise,
+        streamSummary=args.stream_summary,
     )
 
 
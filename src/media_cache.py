@@ -0,0 +1,142 @@
+import hashlib
+import os
+import random
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Callable
+
+import yt_dlp
+from loguru import logger
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+MEDIA_CACHE_DIR = REPO_ROOT / "data" / "media_cache"
+MEDIA_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+WORK_DIR = REPO_ROOT / "tmp"
+
+DISK_MAX_BYTES = 10 * 1024 * 1024 * 1024
+DISK_MAX_AGE_SECONDS = 60 * 60 * 24 * 30
+
+YTDLP_OPTIONS = {
+    # Many sites list no audio-only format; fall back to the smallest rendition.
+    "format": "bestaudio/worst[acodec!=none]/worst",
+    # "best" stream-copies the audio track instead of re-encoding it.
+    "postprocessors": [
+        {
+            "key": "FFmpegExtractAudio",
+            "preferredcodec": "best",
+        }
+    ],
+}
+
+_lock = threading.Lock()
+
+
+def _key(media_id: str) -> str:
+    return hashlib.sha256(media_id.encode("utf-8")).hexdigest()
+
+
+def _cached_path(key: str) -> Path | None:
+    return next((MEDIA_CACHE_DIR / key[:2]).glob(f"{key}.*"), None)
+
+
+def _working_copy(path: Path) -> str:
+    """Hand out a copy, since the chunker deletes the file it is given."""
+    WORK_DIR.mkdir(exist_ok=True)
+    copy_path = WORK_DIR / (
+        f"{time.time()}_{random.randint(1000000000, 9999999999)}{path.suffix}"
+    )
+    try:
+        # data/ and tmp/ share a filesystem, so a hard link costs nothing.
+        os.link(path, copy_path)
+    except OSError:
+        shutil.copyfile(path, copy_path)
+    return str(copy_path)
+
+
+def get(media_id: str) -> str | None:
+    path = _cached_path(_key(media_id))
+    if path is None:
+        return None
+    if time.time() - path.stat().st_mtime > DISK_MAX_AGE_SECONDS:
+        path.unlink(missing_ok=True)
+        return None
+    # Touch on read so eviction follows least-recent use, not download time.
+    os.utime(path)
+    logger.info("Using cached audio for {}", media_id)
+    return _working_copy(path)
+
+
+def put(media_id: str, audio_file: str) -> str:
+    """Move ``audio_file`` into the cache and return a working copy of it."""
+    key = _key(media_id)
+    path = MEDIA_CACHE_DIR / key[:2] / f"{key}{Path(audio_file).suffix}"
+    path.parent.mkdir(exist_ok=True)
+    with _lock:
+        existing = _cached_path(key)
+        if existing and existing != path:
+            existing.unlink(missing_ok=True)
+        shutil.move(audio_file, path)
+    evict()
+    return _working_copy(path)
+
+
+def fetch_audio(media_id: str, download: Callable[[], str]) -> str:
+    """Return a working copy of ``media_id``'s audio, calling ``download`` on a miss.
+
+    ``media_id`` should name the media itself (e.g. ``"Rumble:v4abc"``), not
+    the page it was found on, so every route to the same audio shares an
+    entry.
+    """
+    cached = get(media_id)
+    if cached:
+        return cached
+    return put(media_id, download())
+
+
+def fetch_ytdlp_audio(url: str) -> tuple[str, dict]:
+    """Fetch the audio of anything yt-dlp supports, via the cache.
+
+    Metadata is extracted once: it yields the canonical media id for the cache
+    lookup and, on a miss, drives the download directly.
+    """
+    WORK_DIR.mkdir(exist_ok=True)
+    randomNumber = f"{time.time()}_{random.randint(1000000000, 9999999999)}"
+    ydl_opts = {**YTDLP_OPTIONS, "outtmpl": str(WORK_DIR / f"{randomNumber}.%(ext)s")}
+    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        info_dict = ydl.extract_info(url, download=False)
+        media_id = f"{info_dict['extractor_key']}:{info_dict['id']}"
+
+        def download() -> str:
+            result = ydl.process_ie_result(info_dict, download=True)
+            return result["requested_downloads"][0]["filepath"]
+
+        return fetch_audio(media_id, download), info_dict
+
+
+def evict(
+    max_bytes: int = DISK_MAX_BYTES, max_age_seconds: int = DISK_MAX_AGE_SECONDS
+) -> None:
+    entries = []
+    now = time.time()
+    for path in MEDIA_CACHE_DIR.glob("*/*"):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        if now - stat.st_mtime > max_age_seconds:
+            path.unlink(missing_ok=True)
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+
+    total_bytes = sum(size for _, size, _ in entries)
+    if total_bytes <= max_bytes:
+        return
+    entries.sort()
+    for _, size, path in entries:
+        if total_bytes <= max_bytes:
+            break
+        logger.info("Evicting cached audio {}", path.name)
+        path.unlink(missing_ok=True)
+        total_bytes -= size
@@ -0,0 +1,119 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from loguru import logger
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+PAGE_CACHE_DIR = REPO_ROOT / "data" / "page_cache"
+PAGE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+
+# Extracted markdown includes comments, so it is not reused past this age.
+MAX_AGE_SECONDS = 60 * 60 * 24 * 7
+# Aliases are tiny and touched on use; drop ones not seen for this long.
+ALIAS_MAX_AGE_SECONDS = 60 * 60 * 24 * 180
+DISK_MAX_BYTES = 256 * 1024 * 1024
+EVICT_EVERY_PUTS = 50
+
+_lock = threading.Lock()
+_puts_since_evict = EVICT_EVERY_PUTS
+
+
+def _key(url: str) -> str:
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+
+def _path_for(url: str, suffix: str) -> Path:
+    key = _key(url)
+    return PAGE_CACHE_DIR / key[:2] / f"{key}{suffix}"
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    path.parent.mkdir(exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+
+def resolve(url: str) -> str:
+    """Return the canonical URL ``url`` was last seen to alias, else ``url``."""
+    path = _path_for(url, ".alias")
+    try:
+        canonical_url = path.read_text().strip()
+    except FileNotFoundError:
+        return url
+    os.utime(path)
+    return canonical_url or url
+
+
+def add_alias(url: str, canonical_url: str) -> None:
+    if url == canonical_url or resolve(url) == canonical_url:
+        return
+    logger.info("{} is an alias of {}", url, canonical_url)
+    _write_atomic(_path_for(url, ".alias"), canonical_url.encode("utf-8"))
+
+
+def get(canonical_url: str) -> dict | None:
+    """Return ``{"url", "markdown", "title", "fetched_at"}`` if fresh, else None."""
+    path = _path_for(canonical_url, ".json")
+    try:
+        entry = json.loads(path.read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    if time.time() - entry.get("fetched_at", 0) > MAX_AGE_SECONDS:
+        path.unlink(missing_ok=True)
+        return None
+    logger.info("Using cached extraction of {}", canonical_url)
+    return entry
+
+
+def put(canonical_url: str, markdown: str, title: str) -> None:
+    """Store a page's extraction under its canonical URL."""
+    global _puts_since_evict
+    entry = {
+        "url": canonical_url,
+        "markdown": markdown,
+        "title": title,
+        "fetched_at": time.time(),
+    }
+    _write_atomic(_path_for(canonical_url, ".json"), json.dumps(entry).encode("utf-8"))
+    with _lock:
+        _puts_since_evict += 1
+        should_evict = _puts_since_evict >= EVICT_EVERY_PUTS
+        if should_evict:
+            _puts_since_evict = 0
+    if should_evict:
+        evict()
+
+
+def evict(
+    max_bytes: int = DISK_MAX_BYTES,
+    max_age_seconds: int = MAX_AGE_SECONDS,
+    alias_max_age_seconds: int = ALIAS_MAX_AGE_SECONDS,
+) -> None:
+    entries = []
+    now = time.time()
+    for path in PAGE_CACHE_DIR.glob("*/*"):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        max_age = alias_max_age_seconds if path.suffix == ".alias" else max_age_seconds
+        if now - stat.st_mtime > max_age:
+            path.unlink(missing_ok=True)
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+
+    total_bytes = sum(size for _, size, _ in entries)
+    if total_bytes <= max_bytes:
+        return
+    entries.sort()
+    for _, size, path in entries:
+        if total_bytes <= max_bytes:
+            break
+        logger.info("Evicting page cache entry {}", path.name)
+        path.unlink(missing_ok=True)
+        total_bytes -= size
@@ -0,0 +1,310 @@
+import argparse
+import contextlib
+import fcntl
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from loguru import logger
+from openai import OpenAI
+
+import summary_cache
+import utilities
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+BATCH_DIR = REPO_ROOT / "data" / "summary_batch"
+BATCH_DIR.mkdir(parents=True, exist_ok=True)
+PENDING_PATH = BATCH_DIR / "pending.jsonl"
+PENDING_LOCK_PATH = BATCH_DIR / "pending.lock"
+BATCHES_PATH = BATCH_DIR / "batches.json"
+LOG_DIR = REPO_ROOT / "logs"
+LOG_DIR.mkdir(exist_ok=True)
+logger.add(LOG_DIR / "summary_batch.log", rotation="256 KB", retention=5, enqueue=False)
+
+BATCH_ENDPOINT = "/v1/responses"
+COMPLETION_WINDOW = "24h"
+POLL_INTERVAL_SECONDS = 60
+IN_FLIGHT_STATUSES = {"validating", "in_progress", "finalizing", "cancelling"}
+
+_lock = threading.Lock()
+
+
+@contextlib.contextmanager
+def _pending_lock():
+    """Serialise queue appends and takes across threads and processes."""
+    with _lock, PENDING_LOCK_PATH.open("a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _client() -> OpenAI:
+    return OpenAI(api_key=utilities._get_openai_api_key())
+
+
+def _read_jsonl(path: Path) -> list[dict]:
+    if not path.exists():
+        return []
+    with path.open() as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+def _append_jsonl(path: Path, records: list[dict]) -> None:
+    with path.open("a") as file:
+        for record in records:
+            file.write(json.dumps(record) + "\n")
+
+
+def _read_batches() -> dict:
+    if not BATCHES_PATH.exists():
+        return {}
+    content = BATCHES_PATH.read_text().strip()
+    return json.loads(content) if content else {}
+
+
+def _write_batches(batches: dict) -> None:
+    BATCHES_PATH.write_text(json.dumps(batches, indent=4))
+
+
+def enqueue(
+    text: str,
+    name: str,
+    *,
+    guid: str | None,
+    gist_id: str | None,
+    summarise: bool,
+    source_url: str | None,
+) -> None:
+    item = {
+        "text": text,
+        "name": name,
+        "guid": guid,
+        "gist_id": gist_id,
+        "summarise": summarise,
+        "source_url": source_url,
+    }
+    with _pending_lock():
+        _append_jsonl(PENDING_PATH, [item])
+    logger.info("Queued {} for batch summarisation", name)
+
+
+def _take_pending() -> list[dict]:
+    with _pending_lock():
+        if not PENDING_PATH.exists():
+            return []
+        # Move the queue aside so conversions running meanwhile start a fresh one.
+        staged_path = BATCH_DIR / f"{int(time.time())}.{os.getpid()}.staged.jsonl"
+        os.replace(PENDING_PATH, staged_path)
+    items = _read_jsonl(staged_path)
+    staged_path.unlink()
+    return items
+
+
+def _requeue(items: list[dict]) -> None:
+    if not items:
+        return
+    with _pending_lock():
+        _append_jsonl(PENDING_PATH, items)
+
+
+def _batch_request_line(request: dict) -> dict:
+    return {
+        "custom_id": request["key"],
+        "method": "POST",
+        "url": BATCH_ENDPOINT,
+        "body": {
+            "model": utilities.MODEL_NAME,
+            "input": request["messages"],
+            "reasoning": {"effort": utilities.REASONING_EFFORT},
+        },
+    }
+
+
+def _write_items(items: list[dict]) -> None:
+    unfinished = []
+    for item in items:
+        if utilities.pending_summary_requests(item["text"], item["summarise"]):
+            unfinished.append(item)
+            continue
+        gist_url = utilities.writeGist(
+            item["text"],
+            item["name"],
+            item["guid"],
+            gist_id=item["gist_id"],
+            update=True,
+            summarise=item["summarise"],
+            source_url=item["source_url"],
+        )
+        logger.info("Wrote batch-summarised gist {}: {}", item["name"], gist_url)
+    if unfinished:
+        logger.warning("Re-queueing {} item(s) with missing results", len(unfinished))
+        _requeue(unfinished)
+
+
+def submit_pending() -> str | None:
+    items = _take_pending()
+    if not items:
+        logger.info("No pending summarisation requests")
+        return None
+
+    requests_by_key: dict[str, dict] = {}
+    for item in items:
+        for request in utilities.pending_summary_requests(
+            item["text"], item["summarise"]
+        ):
+            # Identical content queued by several conversions is only summarised once.
+            requests_by_key.setdefault(request["key"], request)
+
+    if not requests_by_key:
+        _write_items(items)
+        return None
+
+    stamp = f"{int(time.time())}.{os.getpid()}"
+    input_path = BATCH_DIR / f"{stamp}.requests.jsonl"
+    items_path = BATCH_DIR / f"{stamp}.items.jsonl"
+    try:
+        _append_jsonl(
+            input_path,
+            [_batch_request_line(request) for request in requests_by_key.values()],
+        )
+        _append_jsonl(items_path, items)
+        client = _client()
+        with input_path.open("rb") as file:
+            uploaded = client.files.create(file=file, purpose="batch")
+        batch = client.batches.create(
+            input_file_id=uploaded.id,
+            endpoint=BATCH_ENDPOINT,
+            completion_window=COMPLETION_WINDOW,
+        )
+    except Exception:
+        input_path.unlink(missing_ok=True)
+        items_path.unlink(missing_ok=True)
+        _requeue(items)
+        raise
+
+    batches = _read_batches()
+    batches[batch.id] = {
+        "input_path": str(input_path),
+        "items_path": str(items_path),
+        "request_count": len(requests_by_key),
+        "submitted_at": int(time.time()),
+    }
+    _write_batches(batches)
+    logger.info(
+        "Submitted batch {} with {} request(s) for {} item(s)",
+        batch.id,
+        len(requests_by_key),
+        len(items),
+    )
+    return batch.id
+
+
+def _response_output_text(body: dict) -> str:
+    if body.get("output_text"):
+        return body["output_text"]
+    parts = []
+    for output in body.get("output") or []:
+        if output.get("type") != "message":
+            continue
+        for content in output.get("content") or []:
+            if content.get("type") == "output_text":
+                parts.append(content.get("text", ""))
+    return "".join(parts)
+
+
+def _store_results(client: OpenAI, output_file_id: str) -> int:
+    stored = 0
+    content = client.files.content(output_file_id).text
+    for line in content.splitlines():
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        response = record.get("response") or {}
+        if record.get("error") or response.get("status_code") != 200:
+            logger.error(
+                "Batch request {} failed: {}",
+                record.get("custom_id"),
+                record.get("error") or response.get("body"),
+            )
+            continue
+        text = _response_output_text(response.get("body") or {}).strip()
+        if not text:
+            logger.error("Empty batch response for {}", record.get("custom_id"))
+            continue
+        summary_cache.put(record["custom_id"], text)
+        stored += 1
+    return stored
+
+
+def poll_batches() -> int:
+    """Collect finished batches and return how many are still in flight."""
+    batches = _read_batches()
+    if not batches:
+        return 0
+    client = _client()
+    in_flight = 0
+    for batch_id, record in list(batches.items()):
+        batch = client.batches.retrieve(batch_id)
+        if batch.status in IN_FLIGHT_STATUSES:
+            in_flight += 1
+            continue
+        if batch.status == "completed" and batch.output_file_id:
+            stored = _store_results(client, batch.output_file_id)
+            logger.info(
+                "Batch {} completed: {}/{} result(s) cached",
+                batch_id,
+                stored,
+                record["request_count"],
+            )
+        else:
+            logger.error("Batch {} ended with status {}", batch_id, batch.status)
+
+        items_path = Path(record["items_path"])
+        _write_items(_read_jsonl(items_path))
+        items_path.unlink(missing_ok=True)
+        Path(record["input_path"]).unlink(missing_ok=True)
+        del batches[batch_id]
+        _write_batches(batches)
+    return in_flight
+
+
+def run(poll_interval: int = POLL_INTERVAL_SECONDS) -> None:
+    submit_pending()
+    while poll_batches():
+        time.sleep(poll_interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Summarise queued conversions through the OpenAI Batch API."
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("submit", help="Submit queued summarisation requests.")
+    subparsers.add_parser(
+        "poll", help="Collect finished batches and write their gists."
+    )
+    run_parser = subparsers.add_parser(
+        "run", help="Submit queued requests and poll until every batch finishes."
+    )
+    run_parser.add_argument(
+        "--poll-interval",
+        type=int,
+        default=POLL_INTERVAL_SECONDS,
+        help="Seconds between polls.",
+    )
+    args = parser.parse_args()
+
+    if args.command == "submit":
+        print(submit_pending())
+    elif args.command == "poll":
+        print(poll_batches())
+    elif args.command == "run":
+        run(args.poll_interval)
+
+
+if __name__ == "__main__":
+    main()
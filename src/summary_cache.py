@@ -0,0 +1,105 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from loguru import logger
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SUMMARY_CACHE_DIR = REPO_ROOT / "data" / "summary_cache"
+SUMMARY_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+
+MEMORY_MAX_ENTRIES = 256
+DISK_MAX_BYTES = 512 * 1024 * 1024
+DISK_MAX_AGE_SECONDS = 60 * 60 * 24 * 90
+EVICT_EVERY_PUTS = 50
+
+_memory: OrderedDict[str, str] = OrderedDict()
+_lock = threading.Lock()
+_puts_since_evict = EVICT_EVERY_PUTS
+
+
+def make_key(kind: str, text: str, *, model: str, prompt_version: str) -> str:
+    content_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    raw_key = f"{kind}:{model}:{prompt_version}:{content_hash}"
+    return hashlib.sha256(raw_key.encode("utf-8")).hexdigest()
+
+
+def _path_for(key: str) -> Path:
+    return SUMMARY_CACHE_DIR / key[:2] / f"{key}.txt"
+
+
+def _remember(key: str, value: str) -> None:
+    _memory[key] = value
+    _memory.move_to_end(key)
+    while len(_memory) > MEMORY_MAX_ENTRIES:
+        _memory.popitem(last=False)
+
+
+def get(key: str) -> str | None:
+    with _lock:
+        if key in _memory:
+            _memory.move_to_end(key)
+            return _memory[key]
+
+    path = _path_for(key)
+    try:
+        value = path.read_text()
+    except FileNotFoundError:
+        return None
+    if time.time() - path.stat().st_mtime > DISK_MAX_AGE_SECONDS:
+        path.unlink(missing_ok=True)
+        return None
+    # Touch on read so disk eviction follows least-recent use, not creation time.
+    os.utime(path)
+    with _lock:
+        _remember(key, value)
+    return value
+
+
+def put(key: str, value: str) -> None:
+    global _puts_since_evict
+    path = _path_for(key)
+    path.parent.mkdir(exist_ok=True)
+    tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp_path.write_text(value)
+    os.replace(tmp_path, path)
+    with _lock:
+        _remember(key, value)
+        _puts_since_evict += 1
+        should_evict = _puts_since_evict >= EVICT_EVERY_PUTS
+        if should_evict:
+            _puts_since_evict = 0
+    if should_evict:
+        evict()
+
+
+def evict(
+    max_bytes: int = DISK_MAX_BYTES, max_age_seconds: int = DISK_MAX_AGE_SECONDS
+) -> None:
+    entries = []
+    now = time.time()
+    for path in SUMMARY_CACHE_DIR.glob("*/*.txt"):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        if now - stat.st_mtime > max_age_seconds:
+            path.unlink(missing_ok=True)
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+
+    total_bytes = sum(size for _, size, _ in entries)
+    if total_bytes <= max_bytes:
+        return
+    entries.sort()
+    for _, size, path in entries:
+        if total_bytes <= max_bytes:
+            break
+        logger.info("Evicting summary cache entry {}", path.name)
+        path.unlink(missing_ok=True)
+        total_bytes -= size
+        with _lock:
+            _memory.pop(path.stem, None)
@@ -0,0 +1,215 @@
+import argparse
+import math
+import multiprocessing
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+
+from loguru import logger
+from openai import OpenAI
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+TRANSCRIPTION_BACKEND = os.getenv("TRANSCRIPTION_BACKEND", "openai")
+# faster-whisper model name or path; ".en" models are faster for English-only audio.
+LOCAL_WHISPER_MODEL = os.getenv("LOCAL_WHISPER_MODEL", "small.en")
+LOCAL_COMPUTE_TYPE = "int8"
+LOCAL_BEAM_SIZE = 1
+# CTranslate2 scales well to about four threads per decode, so split cores that way.
+LOCAL_THREADS_PER_WORKER = 4
+
+_openai_client = None
+_openai_client_lock = threading.Lock()
+_local_model = None
+
+
+def _initial_prompt(chunk_index: int) -> str:
+    if chunk_index > 0:
+        return "Continuation of audio (might begin mid-sentence): "
+    return "Welcome to this technical episode. "
+
+
+def _segment_dicts(segments) -> list[dict]:
+    return [
+        {"start": segment.start, "end": segment.end, "text": segment.text}
+        for segment in segments or []
+    ]
+
+
+def _get_openai_client() -> OpenAI:
+    global _openai_client
+    with _openai_client_lock:
+        if _openai_client is None:
+            import utilities
+
+            _openai_client = OpenAI(api_key=utilities._get_openai_api_key())
+        return _openai_client
+
+
+def transcribe_openai(chunk_filename, chunk_index, total_chunks) -> dict:
+    logger.info("Transcribing chunk {} of {}", chunk_index + 1, total_chunks)
+    with open(chunk_filename, "rb") as audio_file:
+        transcript = _get_openai_client().audio.transcriptions.create(
+            file=audio_file,
+            model="whisper-1",
+            language="en",
+            response_format="verbose_json",
+            timestamp_granularities=["segment"],
+            prompt=_initial_prompt(chunk_index),
+        )
+    return {
+        "filename": chunk_filename,
+        "transcript": transcript.text,
+        "segments": _segment_dicts(transcript.segments),
+        "chunk_index": chunk_index,
+    }
+
+
+def _openai_executor(max_workers: int) -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=max_workers)
+
+
+def _init_local_worker(model_name: str, cpu_threads: int) -> None:
+    global _local_model
+    from faster_whisper import WhisperModel
+
+    _local_model = WhisperModel(
+        model_name,
+        device="cpu",
+        compute_type=LOCAL_COMPUTE_TYPE,
+        cpu_threads=cpu_threads,
+    )
+
+
+def transcribe_local(chunk_filename, chunk_index, total_chunks) -> dict:
+    logger.info("Transcribing chunk {} of {} locally", chunk_index + 1, total_chunks)
+    segments, _ = _local_model.transcribe(
+        chunk_filename,
+        language="en",
+        beam_size=LOCAL_BEAM_SIZE,
+        initial_prompt=_initial_prompt(chunk_index),
+    )
+    # The segment generator runs the decode; materialise it inside the worker.
+    segments = _segment_dicts(list(segments))
+    return {
+        "filename": chunk_filename,
+        "transcript": "".join(segment["text"] for segment in segments),
+        "segments": segments,
+        "chunk_index": chunk_index,
+    }
+
+
+def _local_max_workers() -> int:
+    return max(1, (os.cpu_count() or 1) // LOCAL_THREADS_PER_WORKER)
+
+
+def _local_executor(max_workers: int) -> ProcessPoolExecutor:
+    try:
+        import faster_whisper  # noqa: F401
+    except ImportError as e:
+        raise ImportError(
+            "The faster-whisper backend needs `pip install faster-whisper`."
+        ) from e
+    cpu_threads = max(1, (os.cpu_count() or 1) // max_workers)
+    # Each worker loads the model once; spawn avoids forking the caller's threads.
+    return ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_local_worker,
+        initargs=(LOCAL_WHISPER_MODEL, cpu_threads),
+    )
+
+
+BACKENDS = {
+    "openai": {
+        "transcribe": transcribe_openai,
+        "make_executor": _openai_executor,
+        "max_workers": 4,
+    },
+    "faster-whisper": {
+        "transcribe": transcribe_local,
+        "make_executor": _local_executor,
+        "max_workers": _local_max_workers(),
+    },
+}
+
+
+def get_backend(name: str | None = None) -> dict:
+    name = name or TRANSCRIPTION_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(
+            f"Unknown transcription backend {name!r}; choose from {', '.join(BACKENDS)}"
+        )
+    return BACKENDS[name]
+
+
+def benchmark(audio_file: str, backends: list[str]) -> list[dict]:
+    """Transcribe ``audio_file`` with each backend and report its real-time factor."""
+    import utilities
+
+    results = []
+    output_dir = REPO_ROOT / "tmp"
+    output_dir.mkdir(exist_ok=True)
+    for name in backends:
+        # chunk_mp3 deletes its input, so give each backend its own copy.
+        suffix = Path(audio_file).suffix
+        copy_path = output_dir / f"{int(time.time())}_benchmark_{name}{suffix}"
+        shutil.copyfile(audio_file, copy_path)
+        started = time.monotonic()
+        audio_chunks = utilities.chunk_mp3(str(copy_path))
+        prepare_seconds = time.monotonic() - started
+        stats = {}
+        word_count = 0
+        for segments in utilities.iter_transcribed_chunks(
+            audio_chunks, backend=name, stats=stats
+        ):
+            word_count += sum(len(segment["text"].split()) for segment in segments)
+        results.append(
+            {
+                "backend": name,
+                "audio_seconds": stats.get("audio_seconds", 0.0),
+                "prepare_seconds": prepare_seconds,
+                "wall_seconds": stats.get("wall_seconds", 0.0),
+                # Audio too short to decode leaves nothing to divide by.
+                "real_time_factor": (
+                    stats["wall_seconds"] / stats["audio_seconds"]
+                    if stats.get("audio_seconds")
+                    else math.nan
+                ),
+                "words": word_count,
+            }
+        )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare transcription backends on an audio file."
+    )
+    parser.add_argument("audio_file")
+    parser.add_argument(
+        "--backends",
+        nargs="+",
+        default=list(BACKENDS),
+        choices=list(BACKENDS),
+        help="Backends to run, in order.",
+    )
+    args = parser.parse_args()
+
+    print(
+        f"{'backend':<16}{'audio s':>10}{'prep s':>10}{'wall s':>10}"
+        f"{'RTF':>8}{'words':>8}"
+    )
+    for result in benchmark(args.audio_file, args.backends):
+        print(
+            f"{result['backend']:<16}{result['audio_seconds']:>10.0f}"
+            f"{result['prepare_seconds']:>10.1f}{result['wall_seconds']:>10.1f}"
+            f"{result['real_time_factor']:>8.3f}{result['words']:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
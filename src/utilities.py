@@ -1,4 +1,3 @@
-from pydub import AudioSegment
 from math import ceil
 from openai import OpenAI
 import time
@@ -7,8 +6,10 @@ import os
 import re
 import random
 import hashlib
+import threading
 from pathlib import Path
 from typing import Callable, List, Mapping, Optional
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from loguru import logger
@@ -34,6 +35,29 @@ def build_guid_from_url(url: str) -> str:
     return unique_url
 
 
+def build_timestamp_url(
+    url: str, *, query_param: str | None = None, suffix: str = ""
+) -> str:
+    """Return a ``transcribe_mp3`` ``timestamp_url`` template linking into ``url``.
+
+    The fragment, including a ``###`` refresh marker, is dropped; the offset
+    then goes in ``query_param`` (replacing any existing value) or, by default,
+    in a ``#t=`` media fragment. ``suffix`` follows the offset, for players
+    that want a unit such as ``90s``.
+    """
+    parsed = urlparse(url.strip().replace("###", ""))
+    offset = "{seconds}" + suffix
+    if query_param is None:
+        return urlunparse(parsed._replace(fragment=f"t={offset}"))
+    params = [
+        (key, value)
+        for key, value in parse_qsl(parsed.query, keep_blank_values=True)
+        if key != query_param
+    ]
+    query = "&".join(filter(None, [urlencode(params), f"{query_param}={offset}"]))
+    return urlunparse(parsed._replace(query=query, fragment=""))
+
+
 LOG_DIR = REPO_ROOT / "logs"
 LOG_DIR.mkdir(exist_ok=True)
 logger.add(
@@ -46,12 +70,28 @@ logger.add(
 TMP_DIR = REPO_ROOT / "tmp"
 TMP_DIR.mkdir(exist_ok=True)
 
-from write_gist import writeContent, getGistUrl
+from write_gist import LiveGistUpdater, writeContent, getGistUrl
+import audio_utils
+import summary_cache
+import transcription_backends
 
 MODEL_NAME = "gpt-5.1"
+REASONING_EFFORT = "medium"
 MAX_RETRIES = 3
 RETRY_BACKOFF_SECONDS = 2
+SUMMARY_CHUNK_WORDS = 100_000
+# Seconds of audio repeated at the start of each chunk; duplicated words are removed on assembly.
+CHUNK_OVERLAP_SECONDS = 0.0
+# Transcript paragraphs close after this many words, like the YouTube grouping.
+TRANSCRIPT_PARAGRAPH_WORDS = 80
+# Downmix, resample and silence-trim audio before chunking and upload.
+PREPROCESS_AUDIO = True
+SUPPORTED_AUDIO_EXTENSIONS = {"mp3", "m4a", "mp4", "ogg", "opus", "webm", "wav", "flac"}
 DEFAULT_SUMMARISE = False
+DEFAULT_BATCH_SUMMARISE = False
+DEFAULT_STREAM_SUMMARISE = False
+# writeGist's result when the text was queued for batch summarisation instead.
+SUMMARY_QUEUED = "queued"
 
 
 class ForecastError(Exception):
@@ -63,23 +103,84 @@ def set_default_summarise(flag: bool) -> None:
     DEFAULT_SUMMARISE = bool(flag)
 
 
+def set_default_batch_summarise(flag: bool) -> None:
+    global DEFAULT_BATCH_SUMMARISE
+    DEFAULT_BATCH_SUMMARISE = bool(flag)
+
+
+def set_default_stream_summarise(flag: bool) -> None:
+    global DEFAULT_STREAM_SUMMARISE
+    DEFAULT_STREAM_SUMMARISE = bool(flag)
+
+
+def gist_guid(guid: str | None, summarise: bool | None = None) -> str | None:
+    """Return the guid ``writeGist`` stores ``guid``'s gist under."""
+    actual_summarise = DEFAULT_SUMMARISE if summarise is None else bool(summarise)
+    return f"{guid}_summary" if actual_summarise and guid else guid
+
+
 def get_gist_url_for_guid(
     guid: str | None, summarise: bool | None = None
 ) -> str | None:
     if not guid:
         return None
-    actual_summarise = DEFAULT_SUMMARISE if summarise is None else bool(summarise)
-    adjusted_guid = f"{guid}_summary" if actual_summarise else guid
-    return getGistUrl(adjusted_guid)
+    return getGistUrl(gist_guid(guid, summarise))
 
 
 def _hash_text(text: str) -> str:
     return hashlib.sha256(text.encode("utf-8")).hexdigest()
 
 
-def _cache_path_for(text: str) -> Path:
-    digest = _hash_text(text)
-    return TMP_DIR / f"{digest}.summary.txt"
+CHUNK_SUMMARY_PROMPT = (
+    "Summarize the following markdown into a bullet digest."
+    "Translate any foreign language text to English."
+    "Avoid embellishment:\n\n"
+    "Instructions for summarising conversations:\n\n"
+    "Preserve links, interesting technical/detailed discussions, conclusions, problems, solutions, points of disagreement, critiques, novel ideas, insights and explanations. Ignore chit chat/throw away comments, chatter, socialising, noise, random news, advertisements, content-less discussion etc. Do not leave things out just because there might be a lot of messages."
+    "Instructions for summarising other text:\n\n"
+    "Preserve all arguments, explanations, problems, conclusions, novel ideas, important maths/equations, insights, points of disagreements, contradictions, important context, contrarian takes, critiques, mechanistic details, rationales, implications. Keep succinct while also easy to follow."
+    "\n\nChunk {chunk_number}:\n\n"
+    "{chunk_text}"
+)
+
+TAKEAWAYS_PROMPT = (
+    "Extract the most interesting/novel/important conclusions, take-aways, implications and findings from the text, in such a way that they make sense on their own."
+    "Write a very succinct dot-point list. Max 6 bullet points. Max 12 words per bullet."
+    "Translate any foreign language text to English."
+    "Do not include background, narration, or procedural detail unless it is itself a takeaway."
+    # "After the bullets, add a single line with an information-density rating based on"
+    # " the percent of the text that is repetition/re-statement/padding/re-iteration"
+    # " instead of new ideas, arguments, explanations, problems, conclusions, novel ideas,"
+    # " insights, points of disagreements, contradictions, important context, contrarian takes,"
+    # " critiques, mechanistic details, rationales, implications."
+    # "Use this exact format for the rating line: 'Info density: X/10'."
+    # "Choose X from 1-10, where 10 = ~0% repetition/padding, 5 = ~50% repetition/padding,"
+    # " and 1 = ~90-100% repetition/padding."
+    # "After the bullets, add a single line estimating what percentage of the"
+    # "Use this exact format for the percentage line: 'Missed content: X%'."
+    "Then add one line prefixed with '**Missed details:** ' (under 30 words) explaining what the reader misses, which fits the below criteria, in as much detail as possible within the word limit, if the reader only reads the bullets and skips reading the full text. Make sure it is useful/accurate and not overly positive or overly critical, to facilitate an informed decision."
+    "Criteria of what counts: interesting arguments, problems, conclusions, explanations, novel ideas, points of disagreement, contrarian takes, critiques, mechanistic details, rationales, implications etc. not including waffling/repetition/re-statement/padding."
+    "Then add one line prefixed with '**Why skip:** ' (under 30 words) that gives the most compelling, insightful yet truthful/accurate explanation/devil's-advocate for why it's not worth reading the rest."
+    "Then add one line prefixed with '**Best rebuttal:** ' (under 60 words) giving the strongest & most compelling truthful/accurate rebuttal to the article's own stated arguments/conclusions, without straw-manning. Ensure rebuttal is not woke, leftist, politically correct, anti-market or pro-singleton but rather is accurate, technical, insightful & compelling for a technical, rationalist, libertarian/landian cryptoecon researcher/developer/engineer/entrepreneur."
+    "Return only bullets and the added lines, no heading or preamble."
+    "Use '-' as the bullet marker."
+    "If the text contains no conclusions, take-aways, or findings, return a single bullet that says:"
+    "'- No clear conclusions, take-aways, or findings.'\n\n"
+    "{text}"
+)
+
+# Prompt versions are derived from the templates so editing a prompt invalidates its cache entries.
+SUMMARY_PROMPT_VERSION = _hash_text(CHUNK_SUMMARY_PROMPT)[:12]
+TAKEAWAYS_PROMPT_VERSION = _hash_text(TAKEAWAYS_PROMPT)[:12]
+
+
+def _summary_cache_key(kind: str, text: str) -> str:
+    prompt_version = (
+        TAKEAWAYS_PROMPT_VERSION if kind == "takeaways" else SUMMARY_PROMPT_VERSION
+    )
+    return summary_cache.make_key(
+        kind, text, model=MODEL_NAME, prompt_version=prompt_version
+    )
 
 
 def _call_with_retry(
@@ -93,7 +194,7 @@ def _call_with_retry(
             resp = client.responses.create(
                 model=MODEL_NAME,
                 input=messages,
-                reasoning={"effort": "medium"},
+                reasoning={"effort": REASONING_EFFORT},
             )
             content = resp.output_text
             if not content:
@@ -109,71 +210,201 @@ def _call_with_retry(
     raise ForecastError(f"GPT call failed after retries: {last_err}")
 
 
-def _summarise_markdown(text: str) -> str:
-    cache_path = _cache_path_for(text)
-    if cache_path.exists():
-        return cache_path.read_text()
+def _stream_with_retry(
+    *,
+    client_factory: Callable[[], OpenAI],
+    messages: List[Mapping[str, str]],
+    on_delta: Callable[[str], None],
+) -> str:
+    """Like _call_with_retry, but streams output and reports the text so far."""
+    last_err: Optional[Exception] = None
+    client = client_factory()
+    for attempt in range(1, MAX_RETRIES + 1):
+        try:
+            content = ""
+            stream = client.responses.create(
+                model=MODEL_NAME,
+                input=messages,
+                reasoning={"effort": REASONING_EFFORT},
+                stream=True,
+            )
+            for event in stream:
+                if event.type == "response.output_text.delta":
+                    content += event.delta
+                    on_delta(content)
+                elif event.type in ("response.failed", "error"):
+                    raise ForecastError(f"Streaming response failed: {event}")
+            if not content:
+                raise ForecastError("Empty response from model.")
+            return content
+        except Exception as exc:  # noqa: PERF203 (retries are bounded)
+            last_err = exc
+            logger.warning(
+                "GPT stream failed (attempt {}/{}): {}", attempt, MAX_RETRIES, exc
+            )
+            if attempt < MAX_RETRIES:
+                time.sleep(RETRY_BACKOFF_SECONDS * attempt)
+    raise ForecastError(f"GPT stream failed after retries: {last_err}")
+
+
+# A chunk unit ends at a newline or a closing </p>, so single-line HTML
+# conversations (Discord, Telegram) still split between messages.
+_CHUNK_UNIT_PATTERN = re.compile(r".*?(?:\n|</p>)|.+", re.IGNORECASE)
 
-    if not text.strip():
-        return ""
 
-    chunk_size = 100_000
-    lines = text.splitlines()
+def _split_markdown_chunks(
+    text: str, chunk_size: int = SUMMARY_CHUNK_WORDS
+) -> list[str]:
+    """Greedily pack text units into chunks of at most ``chunk_size`` words.
+
+    Each boundary depends only on the text before it, so appending to the
+    text leaves every chunk but the last unchanged and their cached digests
+    stay valid.
+    """
     chunks: list[str] = []
-    current_lines: list[str] = []
+    current_units: list[str] = []
     current_word_count = 0
 
-    for line in lines:
-        line_word_count = len(line.split())
-        # If a single line exceeds the chunk size, put it in its own chunk to avoid mid-line splits.
-        if line_word_count > chunk_size:
-            if current_lines:
-                chunks.append("\n".join(current_lines).strip())
-                current_lines = []
-                current_word_count = 0
-            chunks.append(line)
+    def flush() -> None:
+        nonlocal current_units, current_word_count
+        if current_units:
+            chunks.append("".join(current_units).strip())
+        current_units = []
+        current_word_count = 0
+
+    for match in _CHUNK_UNIT_PATTERN.finditer(text):
+        unit = match.group(0)
+        unit_word_count = len(unit.split())
+        # A unit longer than a whole chunk is split on word boundaries as a last resort.
+        if unit_word_count > chunk_size:
+            flush()
+            words = unit.split()
+            for start in range(0, len(words), chunk_size):
+                chunks.append(" ".join(words[start : start + chunk_size]))
             continue
 
-        if current_lines and current_word_count + line_word_count > chunk_size:
-            chunks.append("\n".join(current_lines).strip())
-            current_lines = []
-            current_word_count = 0
+        if current_units and current_word_count + unit_word_count > chunk_size:
+            flush()
 
-        current_lines.append(line)
-        current_word_count += line_word_count
+        current_units.append(unit)
+        current_word_count += unit_word_count
 
-    if current_lines:
-        chunks.append("\n".join(current_lines).strip())
+    flush()
+    return [chunk for chunk in chunks if chunk]
 
-    total_chunks = len(chunks)
 
-    def summarise_single_chunk(chunk_text: str, index: int) -> str:
-        messages = [
+def _chunk_summary_messages(chunk_text: str, index: int) -> list[dict[str, str]]:
+    return [
+        {
+            "role": "user",
+            "content": CHUNK_SUMMARY_PROMPT.format(
+                chunk_number=index + 1, chunk_text=chunk_text
+            ),
+        }
+    ]
+
+
+def _takeaways_messages(text: str) -> list[dict[str, str]]:
+    return [{"role": "user", "content": TAKEAWAYS_PROMPT.format(text=text)}]
+
+
+def _join_chunk_summaries(chunk_summaries: list[str]) -> str:
+    return "\n\n".join(chunk_summaries)
+
+
+def pending_summary_requests(text: str, summarise: bool) -> list[dict]:
+    """Model requests writeGist would still have to make for ``text``.
+
+    Each entry carries the cache key its result belongs under, so once every
+    entry is cached writeGist runs without calling the model.
+    """
+    if not text.strip():
+        return []
+    requests_needed: list[dict] = []
+    takeaways_key = _summary_cache_key("takeaways", text)
+    if summary_cache.get(takeaways_key) is None:
+        requests_needed.append(
+            {
+                "kind": "takeaways",
+                "key": takeaways_key,
+                "messages": _takeaways_messages(text),
+            }
+        )
+    if not summarise:
+        return requests_needed
+
+    if summary_cache.get(_summary_cache_key("summary", text)) is not None:
+        return requests_needed
+    for index, chunk_text in enumerate(_split_markdown_chunks(text)):
+        chunk_key = _summary_cache_key("chunk", chunk_text)
+        if summary_cache.get(chunk_key) is not None:
+            continue
+        requests_needed.append(
             {
-                "role": "user",
-                "content": (
-                    "Summarize the following markdown into a bullet digest."
-                    "Translate any foreign language text to English."
-                    "Avoid embellishment:\n\n"
-                    "Instructions for summarising conversations:\n\n"
-                    "Preserve links, interesting technical/detailed discussions, conclusions, problems, solutions, points of disagreement, critiques, novel ideas, insights and explanations. Ignore chit chat/throw away comments, chatter, socialising, noise, random news, advertisements, content-less discussion etc. Do not leave things out just because there might be a lot of messages."
-                    "Instructions for summarising other text:\n\n"
-                    "Preserve all arguments, explanations, problems, conclusions, novel ideas, important maths/equations, insights, points of disagreements, contradictions, important context, contrarian takes, critiques, mechanistic details, rationales, implications. Keep succinct while also easy to follow."
-                    f"\n\nChunk {index + 1} of {total_chunks}:\n\n"
-                    f"{chunk_text}"
-                ),
+                "kind": "chunk",
+                "key": chunk_key,
+                "messages": _chunk_summary_messages(chunk_text, index),
             }
-        ]
+        )
+    return requests_needed
+
 
-        return _call_with_retry(
-            client_factory=lambda: OpenAI(api_key=_get_openai_api_key()),
-            messages=messages,
-        ).strip()
+def _summarise_markdown(
+    text: str, on_progress: Callable[[list[str]], None] | None = None
+) -> str:
+    """Summarise ``text`` chunk by chunk.
+
+    When ``on_progress`` is given, chunk digests are streamed and it is called
+    with the ordered (partial) digests each time one of them grows.
+    """
+    if not text.strip():
+        return ""
+
+    cache_key = _summary_cache_key("summary", text)
+    cached = summary_cache.get(cache_key)
+    if cached is not None:
+        logger.info("Using cached markdown summary")
+        return cached
+
+    chunks = _split_markdown_chunks(text)
+    total_chunks = len(chunks)
+    ordered_summaries: list[str] = ["" for _ in chunks]
+    progress_lock = threading.Lock()
+
+    def report_progress(index: int, partial_digest: str) -> None:
+        with progress_lock:
+            ordered_summaries[index] = partial_digest
+            snapshot = list(ordered_summaries)
+        on_progress(snapshot)
+
+    def summarise_single_chunk(chunk_text: str, index: int) -> str:
+        # Digests are keyed by chunk content, so a refreshed conversation only
+        # pays for the chunks its new messages touched.
+        chunk_key = _summary_cache_key("chunk", chunk_text)
+        cached_digest = summary_cache.get(chunk_key)
+        if cached_digest is not None:
+            if on_progress:
+                report_progress(index, cached_digest)
+            return cached_digest
+        messages = _chunk_summary_messages(chunk_text, index)
+        client_factory = lambda: OpenAI(api_key=_get_openai_api_key())
+        if on_progress:
+            digest = _stream_with_retry(
+                client_factory=client_factory,
+                messages=messages,
+                on_delta=lambda partial: report_progress(index, partial),
+            ).strip()
+        else:
+            digest = _call_with_retry(
+                client_factory=client_factory, messages=messages
+            ).strip()
+        summary_cache.put(chunk_key, digest)
+        return digest
 
     logger.info(
-        "Summarising markdown in {} chunk(s) of up to {} words, split on newline boundaries",
+        "Summarising markdown in {} chunk(s) of up to {} words, split on line/message boundaries",
         total_chunks,
-        chunk_size,
+        SUMMARY_CHUNK_WORDS,
     )
 
     with ThreadPoolExecutor() as executor:
@@ -182,14 +413,15 @@ def _summarise_markdown(text: str) -> str:
             for idx, chunk in enumerate(chunks)
         }
 
-        ordered_summaries: list[str] = ["" for _ in chunks]
         for future in as_completed(future_to_index):
             idx = future_to_index[future]
-            ordered_summaries[idx] = future.result()
+            digest = future.result()
+            with progress_lock:
+                ordered_summaries[idx] = digest
 
-    summary = "\n\n".join(ordered_summaries)
+    summary = _join_chunk_summaries(ordered_summaries)
 
-    cache_path.write_text(summary)
+    summary_cache.put(cache_key, summary)
     return summary
 
 
@@ -197,42 +429,19 @@ def _summarise_gist_takeaways(text: str) -> str:
     if not text.strip():
         return ""
 
-    messages = [
-        {
-            "role": "user",
-            "content": (
-                "Extract the most interesting/novel/important conclusions, take-aways, implications and findings from the text, in such a way that they make sense on their own."
-                "Write a very succinct dot-point list. Max 6 bullet points. Max 12 words per bullet."
-                "Translate any foreign language text to English."
-                "Do not include background, narration, or procedural detail unless it is itself a takeaway."
-                # "After the bullets, add a single line with an information-density rating based on"
-                # " the percent of the text that is repetition/re-statement/padding/re-iteration"
-                # " instead of new ideas, arguments, explanations, problems, conclusions, novel ideas,"
-                # " insights, points of disagreements, contradictions, important context, contrarian takes,"
-                # " critiques, mechanistic details, rationales, implications."
-                # "Use this exact format for the rating line: 'Info density: X/10'."
-                # "Choose X from 1-10, where 10 = ~0% repetition/padding, 5 = ~50% repetition/padding,"
-                # " and 1 = ~90-100% repetition/padding."
-                # "After the bullets, add a single line estimating what percentage of the"
-                # "Use this exact format for the percentage line: 'Missed content: X%'."
-                "Then add one line prefixed with '**Missed details:** ' (under 30 words) explaining what the reader misses, which fits the below criteria, in as much detail as possible within the word limit, if the reader only reads the bullets and skips reading the full text. Make sure it is useful/accurate and not overly positive or overly critical, to facilitate an informed decision."
-                "Criteria of what counts: interesting arguments, problems, conclusions, explanations, novel ideas, points of disagreement, contrarian takes, critiques, mechanistic details, rationales, implications etc. not including waffling/repetition/re-statement/padding."
-                "Then add one line prefixed with '**Why skip:** ' (under 30 words) that gives the most compelling, insightful yet truthful/accurate explanation/devil's-advocate for why it's not worth reading the rest."
-                "Then add one line prefixed with '**Best rebuttal:** ' (under 60 words) giving the strongest & most compelling truthful/accurate rebuttal to the article's own stated arguments/conclusions, without straw-manning. Ensure rebuttal is not woke, leftist, politically correct, anti-market or pro-singleton but rather is accurate, technical, insightful & compelling for a technical, rationalist, libertarian/landian cryptoecon researcher/developer/engineer/entrepreneur."
-                "Return only bullets and the added lines, no heading or preamble."
-                "Use '-' as the bullet marker."
-                "If the text contains no conclusions, take-aways, or findings, return a single bullet that says:"
-                "'- No clear conclusions, take-aways, or findings.'\n\n"
-                f"{text}"
-            ),
-        }
-    ]
+    cache_key = _summary_cache_key("takeaways", text)
+    cached = summary_cache.get(cache_key)
+    if cached is not None:
+        logger.info("Using cached gist takeaways summary")
+        return cached
 
     logger.info("Generating gist takeaways summary")
-    return _call_with_retry(
+    takeaways = _call_with_retry(
         client_factory=lambda: OpenAI(api_key=_get_openai_api_key()),
-        messages=messages,
+        messages=_takeaways_messages(text),
     ).strip()
+    summary_cache.put(cache_key, takeaways)
+    return takeaways
 
 
 def _strip_highlight_sections(summary: str) -> str:
@@ -265,44 +474,64 @@ def _split_article_comments(text: str) -> tuple[str, str] | None:
     return before.strip(), after.strip()
 
 
-def writeGist(
-    text,
-    name,
-    guid=None,
-    gist_id=None,
-    update=True,
-    summarise=None,
-    source_url: str | None = None,
-):
-    actual_summarise = DEFAULT_SUMMARISE if summarise is None else bool(summarise)
-    adjusted_guid = f"{guid}_summary" if actual_summarise and guid else guid
-
-    takeaways_summary = _summarise_gist_takeaways(text)
-    body_text = _summarise_markdown(text) if actual_summarise else text
+def _build_word_count_line(body_text: str) -> str:
     word_count = _count_words(body_text)
     reading_minutes = ceil(word_count / 450) if word_count else 0
-    word_count_line = ""
-    if takeaways_summary:
-        split_text = _split_article_comments(body_text)
-        if split_text:
-            article_text, comment_text = split_text
-            article_words = _count_words(article_text)
-            comment_words = _count_words(comment_text)
-            article_minutes = ceil(article_words / 450) if article_words else 0
-            comment_minutes = ceil(comment_words / 450) if comment_words else 0
-            word_count_line = (
-                f"**Word count** Art: {_format_count(article_words)}"
-                f" Com: {_format_count(comment_words)}"
-                f" Tot: {_format_count(word_count)}"
-                f" | **Time** Art: {article_minutes}m"
-                f" Com: {comment_minutes}m"
-                f" Tot: {reading_minutes}m (450 wpm)"
-            )
-        else:
-            word_count_line = (
-                f"**Word count** {_format_count(word_count)}"
-                f" | **Time** {reading_minutes}m (450 wpm)"
-            )
+    split_text = _split_article_comments(body_text)
+    if split_text:
+        article_text, comment_text = split_text
+        article_words = _count_words(article_text)
+        comment_words = _count_words(comment_text)
+        article_minutes = ceil(article_words / 450) if article_words else 0
+        comment_minutes = ceil(comment_words / 450) if comment_words else 0
+        return (
+            f"**Word count** Art: {_format_count(article_words)}"
+            f" Com: {_format_count(comment_words)}"
+            f" Tot: {_format_count(word_count)}"
+            f" | **Time** Art: {article_minutes}m"
+            f" Com: {comment_minutes}m"
+            f" Tot: {reading_minutes}m (450 wpm)"
+        )
+    return (
+        f"**Word count** {_format_count(word_count)}"
+        f" | **Time** {reading_minutes}m (450 wpm)"
+    )
+
+
+def _wrap_with_links(
+    content: str, source_url: str | None, highlight_url: str | None
+) -> str:
+    if not source_url:
+        return content
+    top_links = f"[Original]({source_url})"
+    if highlight_url:
+        top_links = f"{top_links} [highlights]({highlight_url})"
+    return f"{top_links}\n\n{content}\n\n[Original]({source_url})"
+
+
+def _write_text_to_gist(
+    content: str, name: str, guid: str | None, gist_id: str | None, suffix: str = "txt"
+) -> str:
+    tmpFile = (
+        TMP_DIR
+        / f"{int(time.time())}.{random.randint(1000000000, 9999999999)}.{suffix}"
+    )
+    tmpFile.write_text(content)
+    gistUrl = "https://gist.github.com/" + gist_id if gist_id else None
+    gistUrl = writeContent(gistUrl, guid, name, tmpFile)
+    tmpFile.unlink()
+    return gistUrl
+
+
+def _publish_gist(
+    body_text: str,
+    takeaways_summary: str,
+    name,
+    adjusted_guid,
+    gist_id,
+    source_url: str | None,
+):
+    word_count_line = _build_word_count_line(body_text) if takeaways_summary else ""
 
     def build_gist_text(highlights_summary: str) -> str:
         if not highlights_summary:
@@ -314,55 +543,173 @@ def writeGist(
             f"{body_text}"
         )
 
-    def wrap_with_links(content: str, highlight_url: str | None) -> str:
-        if not source_url:
-            return content
-        top_links = f"[Original]({source_url})"
-        if highlight_url:
-            top_links = f"{top_links} [highlights]({highlight_url})"
-        return f"{top_links}\n\n{content}\n\n[Original]({source_url})"
-
-    deleteMp3sOlderThan(60 * 60 * 12, getAbsPath("tmp/"))
-    if not update:
-        gistUrl = getGistUrl(adjusted_guid)
-        if gistUrl:
-            return gistUrl
-
     highlights_url = None
     if source_url:
         if not adjusted_guid:
             raise ValueError("source_url requires guid to create highlights gist.")
         highlights_guid = f"{adjusted_guid}_highlights"
         stripped_summary = _strip_highlight_sections(takeaways_summary)
-        highlights_text = wrap_with_links(build_gist_text(stripped_summary), None)
-        highlights_tmp = (
-            TMP_DIR
-            / f"{int(time.time())}.{random.randint(1000000000, 9999999999)}.highlights.txt"
+        highlights_text = _wrap_with_links(
+            build_gist_text(stripped_summary), source_url, None
         )
-        highlights_tmp.write_text(highlights_text)
-        highlights_url = writeContent(
-            None, highlights_guid, f"{name} (highlights)", highlights_tmp
+        highlights_url = _write_text_to_gist(
+            highlights_text,
+            f"{name} (highlights)",
+            highlights_guid,
+            None,
+            suffix="highlights.txt",
         )
-        highlights_tmp.unlink()
-    unixTime = str(int(time.time()))
-    randomNumber = str(random.randint(1000000000, 9999999999))
-    tmpFile = getAbsPath(f"tmp/{unixTime}.{randomNumber}.txt")
-    text_to_write = wrap_with_links(build_gist_text(takeaways_summary), highlights_url)
-    with open(tmpFile, "w") as f:
-        f.write(text_to_write)
-    gistUrl = "https://gist.github.com/" + gist_id if gist_id else None
-    gistUrl = writeContent(gistUrl, adjusted_guid, name, tmpFile)
-    os.remove(tmpFile)
+    text_to_write = _wrap_with_links(
+        build_gist_text(takeaways_summary), source_url, highlights_url
+    )
+    gistUrl = _write_text_to_gist(text_to_write, name, adjusted_guid, gist_id)
     if "https://gist.github.com/" in gistUrl:
         return gistUrl.strip()
     else:
         return None
 
 
+def _build_live_summary_text(
+    partial_digests: list[str], text: str, source_url: str | None
+) -> str:
+    done = [digest for digest in partial_digests if digest]
+    progress = "\n\n".join(done) if done else "_Summarising..._"
+    return _wrap_with_links(
+        "## Summary (in progress)\n\n"
+        f"{progress}\n\n"
+        "---\n\n"
+        "## Original text\n\n"
+        f"{text}",
+        source_url,
+        None,
+    )
+
+
+def _write_streaming_gist(text, name, adjusted_guid, gist_id, source_url):
+    """Publish ``text`` immediately, then stream the summary into the same gist.
+
+    Returns the gist URL as soon as the first version exists; summarisation
+    and the final write continue on a background (non-daemon) thread. If they
+    fail, the gist is rewritten with the original text and an error note.
+    """
+    if source_url and not adjusted_guid:
+        raise ValueError("source_url requires guid to create highlights gist.")
+    gistUrl = _write_text_to_gist(
+        _build_live_summary_text([], text, source_url), name, adjusted_guid, gist_id
+    )
+    live_gist_id = gistUrl.strip().split("/")[-1]
+    logger.info("Published in-progress gist {}", gistUrl)
+
+    def finish() -> None:
+        updater = LiveGistUpdater(live_gist_id, name)
+        try:
+            try:
+                summary = _summarise_markdown(
+                    text,
+                    on_progress=lambda partial: updater.update(
+                        _build_live_summary_text(partial, text, source_url)
+                    ),
+                )
+            finally:
+                updater.close()
+            takeaways_summary = _summarise_gist_takeaways(text)
+            _publish_gist(
+                summary,
+                takeaways_summary,
+                name,
+                adjusted_guid,
+                live_gist_id,
+                source_url,
+            )
+            logger.info("Finished streaming summary into {}", gistUrl)
+        except Exception as exc:
+            logger.exception("Streaming summary into {} failed", gistUrl)
+            try:
+                _write_text_to_gist(
+                    _wrap_with_links(
+                        f"_Summarising failed ({exc}); showing the original text._"
+                        f"\n\n{text}",
+                        source_url,
+                        None,
+                    ),
+                    name,
+                    adjusted_guid,
+                    live_gist_id,
+                )
+            except Exception:
+                logger.exception("Failed to restore the original text in {}", gistUrl)
+
+    threading.Thread(target=finish, name=f"stream-summary-{live_gist_id}").start()
+    return gistUrl.strip()
+
+
+def writeGist(
+    text,
+    name,
+    guid=None,
+    gist_id=None,
+    update=True,
+    summarise=None,
+    source_url: str | None = None,
+):
+    actual_summarise = DEFAULT_SUMMARISE if summarise is None else bool(summarise)
+    adjusted_guid = gist_guid(guid, actual_summarise)
+
+    if DEFAULT_BATCH_SUMMARISE and pending_summary_requests(text, actual_summarise):
+        import summary_batch
+
+        summary_batch.enqueue(
+            text,
+            name,
+            guid=guid,
+            gist_id=gist_id,
+            summarise=actual_summarise,
+            source_url=source_url,
+        )
+        return SUMMARY_QUEUED
+
+    if (
+        actual_summarise
+        and DEFAULT_STREAM_SUMMARISE
+        and text.strip()
+        and summary_cache.get(_summary_cache_key("summary", text)) is None
+    ):
+        deleteMp3sOlderThan(60 * 60 * 12, getAbsPath("tmp/"))
+        if not update:
+            gistUrl = getGistUrl(adjusted_guid)
+            if gistUrl:
+                return gistUrl
+        return _write_streaming_gist(text, name, adjusted_guid, gist_id, source_url)
+
+    takeaways_summary = _summarise_gist_takeaways(text)
+    body_text = _summarise_markdown(text) if actual_summarise else text
+
+    deleteMp3sOlderThan(60 * 60 * 12, getAbsPath("tmp/"))
+    if not update:
+        gistUrl = getGistUrl(adjusted_guid)
+        if gistUrl:
+            return gistUrl
+
+    return _publish_gist(
+        body_text, takeaways_summary, name, adjusted_guid, gist_id, source_url
+    )
+
+
 def deleteMp3sOlderThan(maxAgeSeconds, output_dir):
     files = os.listdir(output_dir)
     for file in files:
-        if file.split(".")[-1] in ["mp3", "m4a", "webm", "part", "mp4", "txt"]:
+        # Includes download_utils' partial downloads and their resume state.
+        if file.split(".")[-1] in [
+            "mp3",
+            "m4a",
+            "ogg",
+            "webm",
+            "flac",
+            "part",
+            "mp4",
+            "txt",
+            "download",
+        ] or file.endswith((".part.json", ".part.tmp")):
             filePath = os.path.join(output_dir, file)
             fileName = filePath.split("/")[-1].split(".")[0]
             if fileName.count("_") == 3:
@@ -374,57 +721,50 @@ def deleteMp3sOlderThan(maxAgeSeconds, output_dir):
                 os.remove(filePath)
 
 
-def chunk_mp3(mp3_file):
-    max_size_mb = 0.8
-    randomNumber = mp3_file.split("/")[-1].split(".")[0]
+def chunk_mp3(
+    mp3_file,
+    *,
+    parallel: bool = False,
+    overlap_seconds: float = CHUNK_OVERLAP_SECONDS,
+    preprocess: bool = PREPROCESS_AUDIO,
+):
+    """Split an audio file into Whisper-sized chunks and delete the original.
+
+    With ``preprocess`` the audio is first downmixed to 16 kHz mono Opus with
+    long silences cut out. Cuts are aligned to nearby silences. Returns
+    ``{"path", "start", "duration", "overlap", "source_start", "time_map"}``
+    dicts in playback order; ``start`` is relative to the uploaded audio and
+    ``source_start`` to the original recording.
+    """
     output_dir = REPO_ROOT / "tmp"
     output_dir.mkdir(exist_ok=True)
     audio_ext = os.path.splitext(mp3_file)[1].lower().lstrip(".")
-    if audio_ext and audio_ext not in {"mp3", "m4a", "mp4"}:
+    if audio_ext and audio_ext not in SUPPORTED_AUDIO_EXTENSIONS:
         raise ValueError(f"Unsupported audio extension: {audio_ext}")
-    audio = AudioSegment.from_file(mp3_file, format=audio_ext or None)
-
-    # Calculate the number of chunks based on the maximum size
-    chunk_size_bytes = max_size_mb * 1024 * 1024
-    total_chunks = ceil(len(audio) / chunk_size_bytes)
-
-    # Split the audio into chunks
-    cumDurOfChunks = 0
-    file_paths = []
-    for i in range(total_chunks):
-        start_time = i * chunk_size_bytes
-        end_time = min((i + 1) * chunk_size_bytes, len(audio))
-        chunk = audio[start_time:end_time]
-        chunk_file = os.path.join(output_dir, f"{randomNumber}_chunk_{i+1}.mp3")
-        cumDurOfChunks += len(chunk) / 1000
-        chunk.export(chunk_file, format="mp3")
-        file_paths.append(chunk_file)
 
-    os.remove(mp3_file)
+    output_prefix = str(output_dir / Path(mp3_file).stem)
+    time_map = []
+    if preprocess:
+        preprocessed_file = (
+            f"{output_prefix}_preprocessed.{audio_utils.PREPROCESS_EXTENSION}"
+        )
+        preprocessed = audio_utils.preprocess_audio(mp3_file, preprocessed_file)
+        os.remove(mp3_file)
+        mp3_file = preprocessed["path"]
+        time_map = preprocessed["time_map"]
 
-    return file_paths
-
-
-### might be worthwhile to modify this so it includes timestamps in the output even if they are not clickable
-def transcribe_mp3_chunk(client, chunk_filename, chunk_index, total_chunks):
-    logger.info("Transcribing chunk {} of {}", chunk_index + 1, total_chunks)
-    with open(chunk_filename, "rb") as audio_file:
-        transcript = client.audio.transcriptions.create(
-            file=audio_file,
-            model="whisper-1",
-            language="en",
-            response_format="text",
-            prompt=(
-                "Continuation of audio (might begin mid-sentence): "
-                if chunk_index > 0
-                else "Welcome to this technical episode. "
-            ),
+    chunks = audio_utils.segment_audio(
+        mp3_file, output_prefix, parallel=parallel, overlap_seconds=overlap_seconds
+    )
+    for chunk in chunks:
+        chunk["source_start"] = audio_utils.map_to_source_time(
+            time_map, chunk["start"]
         )
-    return {
-        "filename": chunk_filename,
-        "transcript": transcript,
-        "chunk_index": chunk_index,
-    }
+        chunk["time_map"] = time_map
+
+    os.remove(mp3_file)
+
+    return chunks
 
 
 def _get_openai_api_key() -> str:
@@ -434,37 +774,164 @@ def _get_openai_api_key() -> str:
     return api_key
 
 
-def transcribe_mp3(audio_chunks):
-    client = OpenAI(api_key=_get_openai_api_key())
-    markdown_transcript = ""
-    logger.info("Transcribing mp3")
-    # Process chunks in parallel
-    with ThreadPoolExecutor() as executor:
-        futures = [
-            executor.submit(
-                transcribe_mp3_chunk, client, chunk_filename, i, len(audio_chunks)
+def iter_transcribed_chunks(
+    audio_chunks,
+    *,
+    max_workers: int | None = None,
+    stats: dict | None = None,
+    backend: str | None = None,
+):
+    """Yield each chunk's transcript segments in order once earlier chunks are done.
+
+    Segments are ``{"start", "text"}`` dicts with ``start`` in seconds on the
+    original recording's timeline; words repeated from an overlapping previous
+    chunk are dropped.
+
+    ``audio_chunks`` are chunk dicts as returned by ``chunk_mp3``, or any
+    iterable of them: chunks are pulled only as workers free up, so a
+    generator that is still downloading can feed the pool. ``backend``
+    names an entry in ``transcription_backends.BACKENDS`` (default from
+    ``TRANSCRIPTION_BACKEND``); at most ``max_workers`` chunks, by default the
+    backend's own limit, are transcribed at once. Each chunk file is deleted
+    as soon as its transcript is collected; if any chunk fails, queued
+    work is cancelled and the remaining chunk files are removed. ``stats`` (if
+    given) receives audio seconds, wall seconds and audio-seconds per
+    wall-second.
+    """
+    transcription_backend = transcription_backends.get_backend(backend)
+    max_workers = max_workers or transcription_backend["max_workers"]
+    # Streamed input has no length until it ends; logs then show "?" for it.
+    total_chunks = len(audio_chunks) if hasattr(audio_chunks, "__len__") else "?"
+    chunk_iterator = iter(audio_chunks)
+    # Let a few finished chunks queue up behind a slow one without unbounded buffering.
+    window = max_workers * 2
+    started = time.monotonic()
+    audio_seconds = 0.0
+    futures = {}
+    submitted_chunks = {}
+    next_to_submit = 0
+    exhausted = False
+    remaining_files = set()
+    previous_text = ""
+    executor = transcription_backend["make_executor"](max_workers)
+    try:
+        index = 0
+        while True:
+            while not exhausted and next_to_submit < index + window:
+                chunk = next(chunk_iterator, None)
+                if chunk is None:
+                    exhausted = True
+                    break
+                submitted_chunks[next_to_submit] = chunk
+                remaining_files.add(chunk["path"])
+                futures[next_to_submit] = executor.submit(
+                    transcription_backend["transcribe"],
+                    chunk["path"],
+                    next_to_submit,
+                    total_chunks,
+                )
+                next_to_submit += 1
+            if index not in futures:
+                break
+            result = futures.pop(index).result()
+            os.remove(result["filename"])
+            remaining_files.discard(result["filename"])
+            chunk = submitted_chunks.pop(index)
+            index += 1
+            overlap = chunk.get("overlap", 0.0)
+            audio_seconds += chunk["duration"] - overlap
+            segments = []
+            for segment in result["segments"]:
+                text = " ".join(segment["text"].split())
+                if overlap and segment["end"] <= overlap:
+                    continue
+                if overlap and segment["start"] < overlap and previous_text:
+                    text = audio_utils.dedupe_overlap(previous_text, text, overlap)
+                if not text:
+                    continue
+                segments.append(
+                    {
+                        "start": audio_utils.map_to_source_time(
+                            chunk.get("time_map", []), chunk["start"] + segment["start"]
+                        ),
+                        "text": text,
+                    }
+                )
+            if segments:
+                previous_text = " ".join(segment["text"] for segment in segments)
+            yield segments
+    finally:
+        for future in futures.values():
+            future.cancel()
+        executor.shutdown(wait=True, cancel_futures=True)
+        if hasattr(chunk_iterator, "close"):
+            # A closed generator removes the chunks it never handed out.
+            chunk_iterator.close()
+        # Chunks never submitted are still on disk when a list was passed in.
+        remaining_files.update(chunk["path"] for chunk in chunk_iterator)
+        for chunk_filename in remaining_files:
+            if os.path.exists(chunk_filename):
+                os.remove(chunk_filename)
+        wall_seconds = time.monotonic() - started
+        speed = audio_seconds / wall_seconds if wall_seconds else 0.0
+        if stats is not None:
+            stats.update(
+                {
+                    "chunks": next_to_submit,
+                    "audio_seconds": audio_seconds,
+                    "wall_seconds": wall_seconds,
+                    "audio_seconds_per_wall_second": speed,
+                }
             )
-            for i, chunk_filename in enumerate(audio_chunks)
-        ]
-
-        # Collect results in order
-        results = []
-        for future in as_completed(futures):
-            results.append(future.result())
-
-        # Sort results by chunk index to maintain original order
-        results.sort(key=lambda x: x["chunk_index"])
-
-        # Process results in order
-        for result in results:
-            markdown_transcript += result["transcript"] + "\n\n"
+        logger.info(
+            "Transcribed {:.0f}s of audio in {:.1f}s ({:.1f} audio-s per wall-s, {} workers)",
+            audio_seconds,
+            wall_seconds,
+            speed,
+            max_workers,
+        )
 
-    markdown_transcript = re.sub(
-        r"((?:\[^.!?\]+\[.!?\]){6})", r"\1\n\n", markdown_transcript
-    )  # split on every 6th sentence
 
-    # Delete all the temporary mp3 files
-    for file in audio_chunks:
-        os.remove(file)
+def transcribe_mp3(
+    audio_chunks,
+    *,
+    max_workers: int | None = None,
+    timestamp_url: str | None = None,
+    backend: str | None = None,
+):
+    """Transcribe ``audio_chunks`` into paragraphs prefixed with their start time.
 
-    return markdown_transcript
+    Segments are grouped into paragraphs of about ``TRANSCRIPT_PARAGRAPH_WORDS``
+    words as they arrive. ``timestamp_url`` (see ``build_timestamp_url``) links
+    each timestamp into the source, with ``{seconds}`` replaced by the offset.
+    """
+    logger.info("Transcribing mp3")
+    paragraphs = []
+    group = []
+    group_word_count = 0
+    group_start_time = 0
+
+    def flush():
+        text = " ".join(group)
+        if timestamp_url:
+            link = timestamp_url.replace("{seconds}", str(group_start_time))
+            paragraphs.append(f"[{group_start_time}]({link}): {text}\n\n")
+        else:
+            paragraphs.append(f"{group_start_time}: {text}\n\n")
+
+    for segments in iter_transcribed_chunks(
+        audio_chunks, max_workers=max_workers, backend=backend
+    ):
+        for segment in segments:
+            if not group:
+                group_start_time = int(segment["start"])
+            group.append(segment["text"])
+            group_word_count += len(segment["text"].split())
+            if group_word_count >= TRANSCRIPT_PARAGRAPH_WORDS:
+                flush()
+                group = []
+                group_word_count = 0
+    if group:
+        flush()
+
+    return "".join(paragraphs)
@@ -2,6 +2,7 @@ import argparse
 import hashlib
 import json
 import os
+import threading
 import time
 from pathlib import Path
 
@@ -22,6 +23,19 @@ LOG_DIR = REPO_ROOT / "logs"
 LOG_DIR.mkdir(exist_ok=True)
 logger.add(LOG_DIR / "write_gist.log", rotation="256 KB", retention=5, enqueue=False)
 
+LIVE_UPDATE_INTERVAL_SECONDS = 5
+
+
+def _headers() -> dict:
+    return {
+        "Accept": "application/vnd.github+json",
+        "Authorization": f"Bearer {gh_api_key}",
+    }
+
+
+def _sanitize_gist_file_name(gist_file_name: str) -> str:
+    return "".join(c if c.isalnum() else " " for c in gist_file_name)
+
 
 def _read_json_file(path: Path) -> dict:
     if not path.exists():
@@ -95,14 +109,11 @@ def write_to_gist(
     gist_file_name: str,
     gist_id: str | None = None,
 ):
-    gist_file_name = "".join(c if c.isalnum() else " " for c in gist_file_name)
+    gist_file_name = _sanitize_gist_file_name(gist_file_name)
 
     logger.info("Writing to gist")
 
-    headers = {
-        "Accept": "application/vnd.github+json",
-        "Authorization": f"Bearer {gh_api_key}",
-    }
+    headers = _headers()
 
     if not gist_id:
         created = _create_gist(text, gist_file_name, headers)
@@ -125,6 +136,61 @@ def write_to_gist(
     return gist_id
 
 
+class LiveGistUpdater:
+    """Pushes in-progress content to an existing gist, coalescing rapid updates.
+
+    Only the latest text passed to ``update`` is written, at most once per
+    ``min_interval`` seconds. The final content should still go through
+    ``write_to_gist`` so the content hash store stays accurate.
+    """
+
+    def __init__(
+        self,
+        gist_id: str,
+        gist_file_name: str,
+        min_interval: float = LIVE_UPDATE_INTERVAL_SECONDS,
+    ):
+        self.gist_id = gist_id
+        self.gist_file_name = _sanitize_gist_file_name(gist_file_name)
+        self.min_interval = min_interval
+        self._pending: str | None = None
+        self._closed = False
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def update(self, text: str) -> None:
+        with self._condition:
+            self._pending = text
+            self._condition.notify()
+
+    def close(self) -> None:
+        with self._condition:
+            self._closed = True
+            self._pending = None
+            self._condition.notify()
+        self._thread.join()
+
+    def _run(self) -> None:
+        headers = _headers()
+        while True:
+            with self._condition:
+                while self._pending is None and not self._closed:
+                    self._condition.wait()
+                if self._closed:
+                    return
+                text, self._pending = self._pending, None
+            _update_gist(self.gist_id, text, self.gist_file_name, headers)
+            # Hold further writes back for min_interval, but stop promptly on close.
+            deadline = time.monotonic() + self.min_interval
+            with self._condition:
+                while not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+
+
 def getGistIdFromGUID(guid: str):
     guid_to_gist_id_dict = {}
     while guid_to_gist_id_dict == {}: